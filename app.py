@@ -8,6 +8,8 @@ import services
 import yaml
 import tempfile
 import shutil
+import queue
+import threading
 from pathlib import Path
 from io import BytesIO
 
@@ -222,20 +224,102 @@ def display_pdf(pdf_path):
         st.error(traceback.format_exc())
 
 class StreamlitHandler(logging.Handler):
-    """Custom logging handler for Streamlit"""
+    """Custom logging handler for Streamlit
+
+    Records logged from worker threads are buffered, since only the script thread can
+    draw elements, and shown on the next call to `render`.
+    """
     def __init__(self, placeholder):
         super().__init__()
         self.placeholder = placeholder
         self.logs = []
         self.counter = 0
+        self.rendered = 0
+        self.lock = threading.Lock()
+        self.script_thread = threading.current_thread()
 
     def emit(self, record):
         log_entry = self.format(record)
-        self.logs.append(log_entry)
-        log_text = "\n".join(self.logs)
+        with self.lock:
+            self.logs.append(log_entry)
+        if threading.current_thread() is self.script_thread:
+            self.render()
+
+    def render(self):
+        """Draw the buffered logs if new records arrived since the last render."""
+        with self.lock:
+            if self.rendered == len(self.logs):
+                return
+            self.rendered = len(self.logs)
+            log_text = "\n".join(self.logs)
         self.counter += 1
         self.placeholder.text_area("Logs", log_text, height=300, key=f"log_area_{self.counter}")
 
+def analyze_job_in_background(url, events, reuse_similar=None, reuse_duplicates=None):
+    """Parse the job and draft the tailored resume, publishing progress to `events`.
+
+    Runs in a worker thread. With `reuse_similar`, the draft of a similar previous job is
+    reused instead of tailoring from scratch, see `create_draft_tailored_resume`. With
+    `reuse_duplicates`, a near-duplicate posting's folder is reused instead of parsing. Every event is an `(event, payload)` tuple: "job" with the
+    ResumeImprover once the job is parsed, the progress events of
+    `create_draft_tailored_resume`, then "done" or "error".
+    """
+    def publish(event, payload=None):
+        events.put((event, payload))
+
+    try:
+        resume_improver = services.ResumeImprover(url, reuse_duplicates=reuse_duplicates)
+        publish("job", resume_improver)
+        resume_improver.create_draft_tailored_resume(
+            auto_open=False,
+            manual_review=False,
+            skip_pdf_create=True,
+            on_progress=publish,
+            reuse_similar=reuse_similar
+        )
+        publish("done", resume_improver)
+    except Exception as e:
+        publish("error", e)
+
+def draft_from_improver(resume_improver):
+    """Return the draft resume as it stands before any stage has finished"""
+    return dict(
+        basic=resume_improver.basic_info,
+        objective=resume_improver.objective,
+        education=resume_improver.education,
+        experiences=[dict(section) for section in resume_improver.experiences or []],
+        projects=[dict(section) for section in resume_improver.projects or []],
+        skills=resume_improver.skills,
+    )
+
+def apply_progress_event(draft, event, payload):
+    """Fold one progress event into the draft resume. Returns True if a stage finished."""
+    if event in ('skills', 'objective', 'experiences', 'projects'):
+        draft[event] = payload
+        return True
+    if event in ('experience', 'project'):
+        i, section = payload
+        draft[event + 's'][i] = section
+    elif event in ('experience_highlights', 'project_highlights'):
+        i, highlights = payload
+        sections = draft[event.split('_')[0] + 's']
+        sections[i] = {**sections[i], 'highlights': highlights}
+    return False
+
+def show_job_summary(placeholder, parsed_job, duplicate_of=None):
+    """Show the parsed job while the resume is still being tailored"""
+    with placeholder.container():
+        st.markdown(f"## {parsed_job.get('company') or 'Company Not Specified'}")
+        st.markdown(f"### {parsed_job.get('job_title') or 'Title Not Specified'}")
+        if duplicate_of:
+            st.warning(
+                f"Same posting as {duplicate_of['url']}: reusing its parse and resume "
+                f"from {duplicate_of['job_location']}. Untick \"Reuse near-duplicate "
+                f"postings\" to analyze this job on its own."
+            )
+        if parsed_job.get('job_summary'):
+            st.info(parsed_job['job_summary'])
+
 def main():
     # Updated Custom CSS for layout control
     st.markdown("""
@@ -408,9 +492,21 @@ def main():
     with container:
         # URL input section is always visible
         url = st.text_input("Enter Job URL:", placeholder="https://example.com/job/...")
+        reuse_similar = st.checkbox(
+            "Reuse the draft of a similar job",
+            value=config.SEMANTIC_REUSE_ENABLED,
+            help="Skip tailoring when a previous job with a near-identical posting was tailored the same way"
+        )
+        reuse_duplicates = st.checkbox(
+            "Reuse near-duplicate postings",
+            value=config.NEAR_DUPLICATE_ENABLED,
+            help="Link a posting whose text and header match a stored one to that job's folder instead of parsing it again"
+        )
         if st.button("Analyze Job", use_container_width=True):
             if url:
                 progress_bar = st.progress(0)
+                job_placeholder = st.empty()
+                draft_placeholder = st.empty()
                 log_placeholder = st.empty()
                 logger = logging.getLogger()
                 logger.setLevel(logging.INFO)
@@ -419,14 +515,50 @@ def main():
                 handler.setFormatter(formatter)
                 logger.addHandler(handler)
 
+                events = queue.Queue()
+                worker = threading.Thread(
+                    target=analyze_job_in_background,
+                    args=(url, events, reuse_similar, reuse_duplicates),
+                    daemon=True
+                )
+                worker.start()
+                draft = None
+                finished_stages = 0
+                total_stages = 3  # skills, experiences, projects
                 try:
-                    st.session_state.resume_improver = services.ResumeImprover(url)
-                    progress_bar.progress(25)
-                    st.session_state.resume_improver.create_draft_tailored_resume(
-                        auto_open=False,
-                        manual_review=False,
-                        skip_pdf_create=True
-                    )
+                    while True:
+                        batch = []
+                        try:
+                            batch.append(events.get(timeout=0.2))
+                            while True:
+                                batch.append(events.get_nowait())
+                        except queue.Empty:
+                            pass
+                        outcome = None
+                        for event, payload in batch:
+                            if event == 'job':
+                                show_job_summary(job_placeholder, payload.parsed_job, payload.duplicate_of)
+                                draft = draft_from_improver(payload)
+                                progress_bar.progress(25)
+                            elif event in ('done', 'error'):
+                                outcome = (event, payload)
+                            elif draft is not None and apply_progress_event(draft, event, payload):
+                                finished_stages += 1
+                                progress_bar.progress(25 + 75 * min(finished_stages, total_stages) // total_stages)
+                        handler.render()
+                        if batch and draft is not None:
+                            draft_placeholder.code(
+                                yaml.dump(draft, sort_keys=False, allow_unicode=True),
+                                language="yaml"
+                            )
+                        if outcome is None and not worker.is_alive() and events.empty():
+                            outcome = ('error', RuntimeError("Job analysis stopped unexpectedly"))
+                        if outcome is not None:
+                            break
+                    event, payload = outcome
+                    if event == 'error':
+                        raise payload
+                    st.session_state.resume_improver = payload
                     with open(st.session_state.resume_improver.yaml_loc, 'r') as f:
                         st.session_state.yaml_content = f.read()
                     progress_bar.progress(100)
@@ -455,6 +587,28 @@ def main():
 
                     # Only show output directory and save options for job analysis mode
                     if st.session_state.preview_mode == 'job':
+                        if st.button("Re-tailor Changed Sections", use_container_width=True):
+                            try:
+                                edited_resume = yaml.safe_load(edited_yaml)
+                            except yaml.YAMLError as e:
+                                edited_resume = None
+                                st.error(f"The edited YAML could not be parsed: {str(e)}")
+                            else:
+                                if not isinstance(edited_resume, dict):
+                                    edited_resume = None
+                                    st.error("The edited YAML must be a mapping of resume sections")
+                            if edited_resume is not None:
+                                with st.spinner("Re-tailoring changed sections..."):
+                                    changes = st.session_state.resume_improver.retailor_changed_sections(
+                                        edited_resume
+                                    )
+                                if changes:
+                                    with open(st.session_state.resume_improver.yaml_loc, 'r') as f:
+                                        st.session_state.yaml_content = f.read()
+                                    st.rerun()
+                                else:
+                                    st.info("No sections changed since the draft was generated")
+
                         output_dir = st.text_input(
                             "Output Directory:",
                             placeholder="/path/to/save/resume"
@@ -528,8 +682,8 @@ def main():
                 # Display job details if available
                 if job_details:
                     # Display company info
-                    st.markdown(f"## {job_details.get('company', 'Company Not Specified')}")
-                    st.markdown(f"### {job_details.get('job_title', 'Title Not Specified')} - {job_details.get('team', 'Team Not Specified')}")
+                    st.markdown(f"## {job_details.get('company') or 'Company Not Specified'}")
+                    st.markdown(f"### {job_details.get('job_title') or 'Title Not Specified'} - {job_details.get('team') or 'Team Not Specified'}")
 
                     # Status badges
                     col1, col2 = st.columns([1, 4])
@@ -1,5 +1,6 @@
 import logging
 import os
+import sys
 import configparser
 from langchain_openai import ChatOpenAI
 
@@ -20,6 +21,16 @@ PROMPTS_PATH = os.path.join(PROJECT_PATH, "prompts")
 CONFIG_PATH = os.path.join(PROJECT_PATH, "config")
 PROMPTS_YAML = os.path.join(PROMPTS_PATH, "prompts.yaml")
 DESCRIPTIONS_YAML = os.path.join(PROMPTS_PATH, "extractor_descriptions.yaml")
+CACHE_PATH = os.path.join(PROJECT_PATH, "cache")
+# Job text extraction: BeautifulSoup parser, and the confidence and length the
+# main-content block needs before it replaces the whole-page text
+HTML_PARSER = "lxml"
+JOB_TEXT_MIN_CONFIDENCE = 0.8
+JOB_TEXT_MIN_CHARS = 200
+# Fill job fields from an embedded schema.org JobPosting and ask the LLM only for the rest
+STRUCTURED_DATA_ENABLED = True
+# Job posts longer than this many tokens are parsed in parallel chunks of at most this size
+JOB_PARSE_CHUNK_TOKENS = 6000
 REQUESTS_HEADERS = {
     "User-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/70.0.3538.102 Safari/537.36 Edge/18.19582"
 }
@@ -28,16 +39,102 @@ REQUESTS_HEADERS = {
 CHAT_MODEL = ChatOpenAI
 MODEL_NAME = "gpt-4o"
 TEMPERATURE = 0.5
+# Route prompt types to a cheaper model; unlisted types use MODEL_NAME
+MODEL_ROUTES = {"JOB_PARSER": "gpt-4o-mini", "SKILLS_MATCHER": "gpt-4o-mini"}
+# Model that retries a routed call whose output fails local validation
+ESCALATION_MODEL_NAME = MODEL_NAME
+# Use slim output schemas without the plan/additional_steps/work fields and matching prompts
+FAST_MODE = False
+# Put static prompt parts and the job posting first so calls share a cacheable prefix
+PROMPT_PREFIX_CACHE_LAYOUT = False
 # OPEN_FILE_COMMAND = "cursor -r"
 OPEN_FILE_COMMAND = "notepad "
 MAX_CONCURRENT_WORKERS = 4
+# Headless batch runs: jobs tailored at once, and where manifests and checkpoints are kept
+BATCH_MAX_WORKERS = 2
+BATCH_RUNS_PATH = os.path.join(DATA_PATH, "batch_runs")
+# Sections rewritten per highlighter call; 1 rewrites each section on its own
+SECTION_BATCH_SIZE = 1
+# Send only the best BM25-ranked highlights of each section to the LLM; None sends all
+HIGHLIGHT_TOP_N = 8
+# Stream section highlights token by token when the caller asks for partial results
+STREAM_HIGHLIGHTS = True
 MAX_RETRIES = 3
 BACKOFF_FACTOR = 5
+# Job page downloads: timeout, pooled connections and concurrent requests per host
+FETCH_TIMEOUT_SECONDS = 20
+FETCH_MAX_CONNECTIONS = 50
+FETCH_PER_HOST_LIMIT = 6
+# Cache downloaded job pages and their parses, revalidated with conditional requests
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_PATH = os.path.join(CACHE_PATH, "page_cache.sqlite3")
+PAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Reuse the parse of a stored posting whose job text SimHash is within this many bits
+NEAR_DUPLICATE_ENABLED = True
+NEAR_DUPLICATE_MAX_HAMMING = 3
+NEAR_DUPLICATE_PATH = os.path.join(CACHE_PATH, "job_fingerprints.sqlite3")
+
+# Define offline fake chat model and record/replay cassette configuration
+FAKE_LLM_LATENCY = 1.0
+FAKE_LLM_JITTER = 0.25
+# Extra fake latency per output token, so benchmarks can compare output sizes offline
+FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN = 0.0
+CASSETTES_PATH = os.path.join(PROJECT_PATH, "cassettes")
+CASSETTE_PATH = os.path.join(CASSETTES_PATH, "pipeline.json")
+CASSETTE_MODE = "auto"
+
+# Define LLM response cache configuration
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(CACHE_PATH, "llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_CACHE_TTL_SECONDS = None
+
+# Define LLM usage accounting configuration; prices are USD per million tokens
+USAGE_AGGREGATE_PATH = os.path.join(CACHE_PATH, "usage_aggregate.json")
+USAGE_AGGREGATE_FLUSH_SECONDS = 5
+MODEL_PRICING = {
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+}
+
+# Define section memoization configuration
+SECTION_MEMO_ENABLED = True
+SECTION_MEMO_PATH = os.path.join(CACHE_PATH, "section_memo.sqlite3")
+SECTION_MEMO_MAX_BYTES = 16 * 1024 * 1024
+
+# Weight of each job field's keywords in the local ATS keyword match score
+ATS_KEYWORD_WEIGHTS = {
+    "ats_keywords": 2.0,
+    "technical_skills": 1.5,
+    "non_technical_skills": 1.0,
+}
+
+# Reuse the draft of a previous job whose parsed posting is similar enough (opt-in)
+SEMANTIC_REUSE_ENABLED = False
+SEMANTIC_REUSE_THRESHOLD = 0.9
+SEMANTIC_REUSE_FEATURES = 2**18
+
+# Define client-side LLM rate limits shared by every call in the process; None disables a limit
+LLM_REQUESTS_PER_MINUTE = 500
+LLM_TOKENS_PER_MINUTE = 30000
+# Fraction of the account limits to target, and seconds of traffic allowed in one burst
+RATE_LIMIT_HEADROOM = 0.9
+RATE_LIMIT_BURST_SECONDS = 30
+# Completion tokens reserved per call, as the provider counts them against the limit up front
+LLM_EXPECTED_COMPLETION_TOKENS = 500
+LLM_MAX_RETRIES = 5
+LLM_RETRY_BASE_SECONDS = 1.0
+# Connections in the HTTP pool shared by all pooled OpenAI clients
+LLM_HTTP_MAX_CONNECTIONS = 20
 
 
 # Confirm presence of OpenAI API key
 def ensure_openai_api_key():
     if "OPENAI_API_KEY" not in os.environ:
+        if not sys.stdin or not sys.stdin.isatty():
+            # Headless runs (cron, containers) cannot answer a prompt; calls will fail instead.
+            logger.warning("OPENAI_API_KEY not found in environment.")
+            return
         logger.info(
             "OPENAI_API_KEY not found in environment. User will be prompted to enter their key."
         )
@@ -1,8 +1,12 @@
-from langchain_core.pydantic_v1 import BaseModel, Field
-from typing import List, Optional
+import time
+import functools
+import concurrent.futures
+from langchain_core.pydantic_v1 import BaseModel, Field, create_model
+from typing import List, Optional, Tuple
 from prompts.prompts import Prompts
 import config
 import services
+import utils
 
 Prompts.initialize()
 
@@ -46,20 +50,176 @@ class JobDescription(BaseModel):
     )
 
 
+@functools.lru_cache(maxsize=None)
+def partial_job_description(fields: Tuple[str, ...]):
+    """Return a `JobDescription` schema restricted to `fields`, built once per field set."""
+    return create_model(
+        "JobDescription",
+        __base__=BaseModel,
+        **{
+            name: (JobDescription.__annotations__[name], JobDescription.__fields__[name].field_info)
+            for name in fields
+        },
+    )
+
+
+def _normalize_mention(text) -> str:
+    return " ".join(str(text).split()).lower()
+
+
+def merge_job_descriptions(parts: List[dict], texts: List[str] = None) -> dict:
+    """Merge partial job descriptions parsed from consecutive chunks of one posting.
+
+    Boolean fields are true if any chunk found them true. Other single-value fields keep
+    the first value found, in chunk order, unless `texts` are given: then the first value
+    that its own chunk's text actually mentions wins, so a guess made from a chunk that
+    does not state the field is overridden by the chunk that does. List fields are
+    concatenated, and items repeated across chunks are kept once (case-insensitively).
+
+    Args:
+        parts (List[dict]): The parsed fields of each chunk.
+        texts (List[str], optional): The text of each chunk, in the same order as `parts`.
+    """
+    merged = {}
+    mentioned = set()
+    for index, part in enumerate(parts):
+        text = _normalize_mention(texts[index]) if texts else None
+        for name, value in part.items():
+            if value in (None, "", []):
+                continue
+            if isinstance(value, list):
+                items = merged.setdefault(name, [])
+                seen = {str(item).strip().lower() for item in items}
+                for item in value:
+                    key = str(item).strip().lower()
+                    if key and key not in seen:
+                        seen.add(key)
+                        items.append(item)
+            elif isinstance(value, bool):
+                merged[name] = merged.get(name, False) or value
+            elif name not in mentioned:
+                in_text = text is not None and _normalize_mention(value) in text
+                if in_text or name not in merged:
+                    merged[name] = value
+                if in_text:
+                    mentioned.add(name)
+    return merged
+
+
 class JobPost:
-    def __init__(self, posting: str):
-        """Initialize JobPost with the job posting string."""
+    def __init__(
+        self, posting: str, usage_log=None, known_fields: dict = None, extra_fields: dict = None
+    ):
+        """Initialize JobPost with the job posting string.
+
+        Args:
+            posting (str): The job posting text.
+            usage_log (UsageLog, optional): Log that records the usage of the parse call.
+            known_fields (dict, optional): `JobDescription` fields already known, e.g. from the
+                page's schema.org JobPosting. Only the other fields are asked of the LLM.
+            extra_fields (dict, optional): List items known for fields the LLM still parses,
+                appended to its output for the same field.
+        """
         self.posting = posting
-        self.extractor_llm = services.langchain_helpers.create_llm(
+        self.usage_log = usage_log
+        self.known_fields = {
+            name: value
+            for name, value in (known_fields or {}).items()
+            if name in JobDescription.__fields__ and value not in (None, "", [])
+        }
+        self.extra_fields = {
+            name: value
+            for name, value in (extra_fields or {}).items()
+            if name in JobDescription.__fields__ and name not in self.known_fields
+        }
+        self.llm_kwargs = dict(
             chat_model=config.CHAT_MODEL,
-            model_name=config.MODEL_NAME,
+            model_name=services.model_router.route("JOB_PARSER"),
             temperature=config.TEMPERATURE,
             cache=True,
         )
+        self.extractor_llm = services.get_llm(**self.llm_kwargs)
         self.parsed_job = None
+        self.chunk_stats = None
 
     def parse_job_post(self, **chain_kwargs) -> dict:
-        """Parse the job posting to extract job description and skills."""
-        model = self.extractor_llm.with_structured_output(JobDescription)
-        self.parsed_job = model.invoke(self.posting).dict()
+        """Parse the job posting to extract job description and skills.
+
+        The posting is parsed by the model routed to JOB_PARSER and re-parsed by the
+        escalation model if the company or job title is missing. Fields in `known_fields`
+        are left out of the output schema, and the LLM is not called if all are known.
+        Items in `extra_fields` are merged into the LLM's lists.
+        Postings longer than `config.JOB_PARSE_CHUNK_TOKENS` are parsed in chunks, see
+        `_parse_in_chunks`.
+        """
+        self.chunk_stats = None
+        missing = tuple(name for name in JobDescription.__fields__ if name not in self.known_fields)
+        if not missing:
+            self.parsed_job = JobDescription(**self.known_fields).dict()
+            return self.parsed_job
+        tokens = services.estimate_tokens(self.posting, self.llm_kwargs["model_name"])
+        if config.JOB_PARSE_CHUNK_TOKENS and tokens > config.JOB_PARSE_CHUNK_TOKENS:
+            parsed = self._parse_in_chunks(missing, tokens)
+        else:
+            parsed = self._parse_text(self.posting, missing)
+        if self.extra_fields:
+            parsed = merge_job_descriptions([parsed, self.extra_fields])
+        self.parsed_job = JobDescription(**dict(parsed, **self.known_fields)).dict()
         return self.parsed_job
+
+    def _parse_text(self, text: str, fields: Tuple[str, ...]) -> dict:
+        """Parse `text` into the given `JobDescription` fields with one routed LLM call."""
+        if len(fields) == len(JobDescription.__fields__):
+            schema = JobDescription
+        else:
+            schema = partial_job_description(fields)
+        model = services.chain_registry.get(None, schema, self.llm_kwargs)
+        callbacks = []
+        if self.usage_log is not None:
+            callbacks.append(self.usage_log.callback("JOB_PARSER"))
+        return services.model_router.invoke(
+            model, text, stage="JOB_PARSER", callbacks=callbacks
+        ).dict()
+
+    def _parse_in_chunks(self, fields: Tuple[str, ...], tokens: int) -> dict:
+        """Map-reduce parse of a long posting.
+
+        The text is split on section boundaries into chunks of at most
+        `config.JOB_PARSE_CHUNK_TOKENS` tokens, which are parsed in parallel and merged
+        with `merge_job_descriptions` against the chunk texts. Company and job title are
+        only asked of the first chunk, which holds the posting's header. Counts and
+        timings are kept in `chunk_stats`.
+        """
+        model_name = self.llm_kwargs["model_name"]
+        chunks = utils.chunk_text(
+            self.posting,
+            config.JOB_PARSE_CHUNK_TOKENS,
+            lambda text: services.estimate_tokens(text, model_name),
+        )
+        header_fields = ("company", "job_title")
+        body_fields = tuple(name for name in fields if name not in header_fields) or fields
+        seconds = [0.0] * len(chunks)
+
+        def parse_chunk(index):
+            start = time.perf_counter()
+            part = self._parse_text(chunks[index], fields if index == 0 else body_fields)
+            seconds[index] = time.perf_counter() - start
+            return part
+
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.MAX_CONCURRENT_WORKERS
+        ) as executor:
+            parts = list(executor.map(parse_chunk, range(len(chunks))))
+        self.chunk_stats = dict(
+            tokens=tokens,
+            chunks=len(chunks),
+            chunk_tokens=[services.estimate_tokens(chunk, model_name) for chunk in chunks],
+            chunk_seconds=seconds,
+            wall_seconds=time.perf_counter() - start,
+        )
+        config.logger.info(
+            f"Parsed a {tokens}-token job post in {len(chunks)} chunks in "
+            f"{self.chunk_stats['wall_seconds']:.1f}s"
+        )
+        return merge_job_descriptions(parts, chunks)
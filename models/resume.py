@@ -36,6 +36,46 @@ class ResumeSectionHighlighterOutput(BaseModel):
         description=Prompts.descriptions["RESUME_SECTION_HIGHLIGHTER_OUTPUT"]["final_answer"],
     )
 
+class ResumeSectionHighlighterFastOutput(BaseModel):
+    """Pydantic class that defines the highlights returned by the LLM in fast mode, without the reasoning fields."""
+
+    final_answer: List[ResumeSectionHighlight] = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SECTION_HIGHLIGHTER_OUTPUT"]["final_answer"],
+    )
+
+class ResumeSectionBatchHighlighterItem(ResumeSectionHighlighterOutput):
+    """Pydantic class that defines the highlights of one section in a batched call."""
+
+    section_id: str = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SECTION_BATCH_HIGHLIGHTER_OUTPUT"]["section_id"],
+    )
+
+class ResumeSectionBatchHighlighterOutput(BaseModel):
+    """Pydantic class that defines highlights for several sections to be returned by the LLM."""
+
+    sections: List[ResumeSectionBatchHighlighterItem] = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SECTION_BATCH_HIGHLIGHTER_OUTPUT"]["sections"],
+    )
+
+class ResumeSectionBatchHighlighterFastItem(ResumeSectionHighlighterFastOutput):
+    """Pydantic class that defines the highlights of one section in a batched call in fast mode."""
+
+    section_id: str = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SECTION_BATCH_HIGHLIGHTER_OUTPUT"]["section_id"],
+    )
+
+class ResumeSectionBatchHighlighterFastOutput(BaseModel):
+    """Pydantic class that defines highlights for several sections returned by the LLM in fast mode."""
+
+    sections: List[ResumeSectionBatchHighlighterFastItem] = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SECTION_BATCH_HIGHLIGHTER_OUTPUT"]["sections"],
+    )
+
 class ResumeSkills(BaseModel):
     """Pydantic class that defines a list of skills to be returned by the LLM."""
 
@@ -64,6 +104,14 @@ class ResumeSkillsMatcherOutput(BaseModel):
         description=Prompts.descriptions["RESUME_SKILLS_MATCHER_OUTPUT"]["final_answer"],
     )
 
+class ResumeSkillsMatcherFastOutput(BaseModel):
+    """Pydantic class that defines the skills returned by the LLM in fast mode, without the reasoning fields."""
+
+    final_answer: ResumeSkills = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_SKILLS_MATCHER_OUTPUT"]["final_answer"],
+    )
+
 class ResumeSummarizerOutput(BaseModel):
     """Pydantic class that defines a list of skills to be returned by the LLM."""
 
@@ -82,6 +130,14 @@ class ResumeSummarizerOutput(BaseModel):
         description=Prompts.descriptions["RESUME_OBJECTIVE_OUTPUT"]["final_answer"],
     )
 
+class ResumeSummarizerFastOutput(BaseModel):
+    """Pydantic class that defines the objective returned by the LLM in fast mode, without the reasoning fields."""
+
+    final_answer: str = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_OBJECTIVE_OUTPUT"]["final_answer"],
+    )
+
 class ResumeImprovements(BaseModel):
     """Pydantic class that defines a list of improvements to be returned by the LLM."""
 
@@ -116,4 +172,20 @@ class ResumeImproverOutput(BaseModel):
     )
     final_answer: List[ResumeImprovements] = Field(
         ..., description=Prompts.descriptions["RESUME_IMPROVER_OUTPUT"]["final_answer"]
-    )
\ No newline at end of file
+    )
+
+class ResumeImproverFastOutput(BaseModel):
+    """Pydantic class that defines the improvements returned by the LLM in fast mode, without the reasoning fields."""
+
+    final_answer: List[ResumeImprovements] = Field(
+        ...,
+        description=Prompts.descriptions["RESUME_IMPROVER_OUTPUT"]["final_answer"],
+    )
+
+FAST_OUTPUT_SCHEMAS = {
+    ResumeSectionHighlighterOutput: ResumeSectionHighlighterFastOutput,
+    ResumeSectionBatchHighlighterOutput: ResumeSectionBatchHighlighterFastOutput,
+    ResumeSkillsMatcherOutput: ResumeSkillsMatcherFastOutput,
+    ResumeSummarizerOutput: ResumeSummarizerFastOutput,
+    ResumeImproverOutput: ResumeImproverFastOutput,
+}
@@ -21,31 +21,51 @@ class Prompts:
         cls.descriptions = cls._load_descriptions(config.DESCRIPTIONS_YAML)
 
     @staticmethod
-    def _load_prompts(yaml_path: str) -> dict:
+    def _load_prompts(yaml_path: str, prefix_cache_layout: bool = None) -> dict:
         """
         Load prompts from a YAML file and organize them into a lookup dictionary.
 
+        With the prefix cache layout, the static instruction, criteria and steps messages
+        come right after the system message, followed by the job posting and, last, the
+        per-call resume content. Every call for the same job then shares one long prefix,
+        which providers with automatic prompt caching can serve at a discount.
+
+        Prompt types with a `fast_steps_message` also get a `<TYPE>_FAST` entry that uses
+        it in place of `steps_message`, for use with the slim fast-mode output schemas.
+
         :param yaml_path: Path to the YAML file containing prompt configurations.
+        :param prefix_cache_layout: Whether to order messages for prefix caching. Defaults to
+            `config.PROMPT_PREFIX_CACHE_LAYOUT`.
         :return: A dictionary with prompt types as keys and lists of message templates as values.
         """
+        if prefix_cache_layout is None:
+            prefix_cache_layout = config.PROMPT_PREFIX_CACHE_LAYOUT
         with open(yaml_path, "r") as file:
             prompts_data = yaml.safe_load(file)
 
         lookup = {}
         for prompt_type, sub_data in prompts_data.items():
-            sub_lookup = [
-                SystemMessage(content=sub_data["system_message"]),
-                HumanMessagePromptTemplate.from_template(
-                    sub_data["job_posting_template"]
-                ),
-                HumanMessagePromptTemplate.from_template(
-                    sub_data.get("resume_template", "")
-                ),
-                HumanMessage(content=sub_data["instruction_message"]),
-                HumanMessage(content=sub_data["criteria_message"]),
-                HumanMessage(content=sub_data["steps_message"]),
-            ]
-            lookup[prompt_type] = sub_lookup
+            system_message = SystemMessage(content=sub_data["system_message"])
+            job_posting = HumanMessagePromptTemplate.from_template(
+                sub_data["job_posting_template"]
+            )
+            resume = HumanMessagePromptTemplate.from_template(
+                sub_data.get("resume_template", "")
+            )
+            variants = {prompt_type: sub_data["steps_message"]}
+            if "fast_steps_message" in sub_data:
+                variants[f"{prompt_type}_FAST"] = sub_data["fast_steps_message"]
+            for variant, steps_message in variants.items():
+                instructions = [
+                    HumanMessage(content=sub_data["instruction_message"]),
+                    HumanMessage(content=sub_data["criteria_message"]),
+                    HumanMessage(content=steps_message),
+                ]
+                if prefix_cache_layout:
+                    sub_lookup = [system_message, *instructions, job_posting, resume]
+                else:
+                    sub_lookup = [system_message, job_posting, resume, *instructions]
+                lookup[variant] = sub_lookup
 
         return lookup
 
@@ -1,3 +1,19 @@
 from .resume_improver import *
 from .langchain_helpers import *
 from .background_runner import *
+from .llm_cache import *
+from .llm_usage import *
+from .fake_llm import *
+from .section_memo import *
+from .stage_scheduler import *
+from .rate_limiter import *
+from .chain_registry import *
+from .model_router import *
+from .job_similarity import *
+from .highlight_ranker import *
+from .keyword_scorer import *
+from .job_fetcher import *
+from .page_cache import *
+from .job_fingerprint import *
+from .sqlite_store import *
+from .batch_runner import *
@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import hashlib
+import threading
+import concurrent.futures
+from datetime import datetime
+from typing import List
+import config
+from services.job_fetcher import iter_fetched
+from services.page_cache import normalize_url
+from services.resume_improver import ResumeImprover
+
+MANIFEST_FILENAME = "manifest.json"
+CHECKPOINTS_DIRNAME = "jobs"
+
+
+def read_job_list(path: str) -> List[dict]:
+    """Read the jobs of a batch from a URL list or a JSONL file.
+
+    A `.jsonl` file holds one object per line with a `url` and optionally
+    `resume_location` and `fast`. Any other file holds one URL per line. Blank lines
+    and lines starting with `#` are skipped, and repeated URLs are kept once.
+
+    Args:
+        path (str): Path to the job list.
+
+    Returns:
+        List[dict]: One job configuration per distinct URL, in file order.
+    """
+    jobs = {}
+    with open(path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if path.endswith(".jsonl"):
+                job = json.loads(line)
+                if not isinstance(job, dict) or not job.get("url"):
+                    raise ValueError(f"{path}:{line_number}: expected an object with a 'url'")
+            else:
+                job = dict(url=line)
+            jobs.setdefault(normalize_url(job["url"]), job)
+    return list(jobs.values())
+
+
+def job_id(url: str) -> str:
+    """Return the checkpoint name of a job, stable across runs for the same normalized URL."""
+    return hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json(path: str, data: dict):
+    """Write JSON through a temporary file, so a killed run never leaves a truncated file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+class BatchRunner:
+    """Tailor the resume to many job postings headlessly, resuming interrupted runs.
+
+    Pages are fetched concurrently with `iter_fetched` and each one is handed to a
+    bounded pool of workers as soon as it arrives. Every job writes a checkpoint to
+    `<run_dir>/jobs/<job id>.json` when it starts and when it ends, and
+    `<run_dir>/manifest.json` collects the outputs, timings and errors of all jobs.
+    Running again on the same `run_dir` skips the jobs whose checkpoint is done.
+    """
+
+    def __init__(
+        self,
+        run_dir: str,
+        workers: int = None,
+        resume_location: str = None,
+        fast: bool = None,
+        skip_pdf_create: bool = False,
+        retry_failed: bool = True,
+    ):
+        """Initialize the BatchRunner.
+
+        Args:
+            run_dir (str): Folder of the manifest and job checkpoints.
+            workers (int, optional): Jobs processed at once. Defaults to `config.BATCH_MAX_WORKERS`.
+            resume_location (str, optional): Resume used by jobs that do not name one.
+                Defaults to `config.DEFAULT_RESUME_PATH`.
+            fast (bool, optional): Use the fast-mode prompts. Defaults to `config.FAST_MODE`.
+            skip_pdf_create (bool, optional): Only write the tailored `resume.yaml`. Defaults to False.
+            retry_failed (bool, optional): Run jobs that failed in a previous run again. Defaults to True.
+        """
+        self.run_dir = run_dir
+        self.workers = workers or config.BATCH_MAX_WORKERS
+        self.resume_location = resume_location
+        self.fast = fast
+        self.skip_pdf_create = skip_pdf_create
+        self.retry_failed = retry_failed
+        self.checkpoints_dir = os.path.join(run_dir, CHECKPOINTS_DIRNAME)
+        self.manifest_path = os.path.join(run_dir, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.checkpoints_dir, exist_ok=True)
+        self.records = self._load_checkpoints()
+
+    def _load_checkpoints(self) -> dict:
+        records = {}
+        for filename in sorted(os.listdir(self.checkpoints_dir)):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.checkpoints_dir, filename), encoding="utf-8") as file:
+                    record = json.load(file)
+                records[record["id"]] = record
+            except (OSError, ValueError, KeyError) as e:
+                config.logger.warning(f"Ignoring unreadable checkpoint {filename}: {e}")
+        return records
+
+    def pending(self, jobs: List[dict]) -> List[dict]:
+        """Return the jobs that still need to run.
+
+        Jobs that were still running when a previous run was killed are run again.
+        """
+        skipped = {"done", "failed"} if not self.retry_failed else {"done"}
+        return [
+            job
+            for job in jobs
+            if self.records.get(job_id(job["url"]), {}).get("status") not in skipped
+        ]
+
+    def _checkpoint(self, record: dict):
+        """Save one job's record and rewrite the manifest."""
+        with self._lock:
+            self.records[record["id"]] = record
+            _write_json(os.path.join(self.checkpoints_dir, f"{record['id']}.json"), record)
+            self._write_manifest()
+
+    def _write_manifest(self):
+        statuses = [record["status"] for record in self.records.values()]
+        _write_json(
+            self.manifest_path,
+            dict(
+                run_dir=self.run_dir,
+                updated_at=datetime.now().isoformat(timespec="seconds"),
+                counts={status: statuses.count(status) for status in sorted(set(statuses))},
+                jobs=sorted(self.records.values(), key=lambda record: record["started_at"]),
+            ),
+        )
+
+    def run_job(
+        self, job: dict, html: str = None, fetch_seconds: float = None, fetch_error: str = None
+    ) -> dict:
+        """Parse one posting and write its tailored resume, checkpointing before and after.
+
+        Args:
+            job (dict): The job configuration, with a `url` and optional `resume_location` and `fast`.
+            html (str, optional): The prefetched page. Defaults to downloading it.
+            fetch_seconds (float, optional): Time the prefetch took, for the manifest.
+            fetch_error (str, optional): Why the prefetch failed. The job is then recorded as
+                failed without running, and is retried by the next run.
+
+        Returns:
+            dict: The job's record as written to its checkpoint.
+        """
+        previous = self.records.get(job_id(job["url"]), {})
+        record = dict(
+            id=job_id(job["url"]),
+            url=job["url"],
+            status="running",
+            attempts=previous.get("attempts", 0) + 1,
+            started_at=datetime.now().isoformat(timespec="seconds"),
+            timings=dict(fetch=fetch_seconds),
+        )
+        self._checkpoint(record)
+        started = time.perf_counter()
+        try:
+            if fetch_error:
+                raise RuntimeError(f"Failed to fetch the job post: {fetch_error}")
+            resume_improver = ResumeImprover(
+                url=job["url"],
+                resume_location=job.get("resume_location") or self.resume_location,
+                html=html,
+            )
+            record["job_location"] = resume_improver.job_data_location
+            record["duplicate_of"] = (resume_improver.duplicate_of or {}).get("url")
+            parsed = time.perf_counter()
+            record["timings"]["parse"] = parsed - started
+            resume_improver.create_draft_tailored_resume(
+                auto_open=False,
+                manual_review=False,
+                skip_pdf_create=True,
+                fast=job.get("fast", self.fast),
+            )
+            record["resume_yaml"] = resume_improver.yaml_loc
+            record["reused_from"] = resume_improver.reused_from
+            record["timings"]["tailor"] = time.perf_counter() - parsed
+            record["timings"]["stages"] = resume_improver.stage_timings
+            if not self.skip_pdf_create:
+                record["pdf"] = resume_improver.create_pdf(auto_open=False)
+            record["status"] = "done"
+        except Exception as e:
+            config.logger.error(f"Batch job {job['url']} failed: {e!r}")
+            record["status"] = "failed"
+            record["error"] = repr(e)
+        record["timings"]["total"] = time.perf_counter() - started
+        record["finished_at"] = datetime.now().isoformat(timespec="seconds")
+        self._checkpoint(record)
+        return record
+
+    def run(self, jobs: List[dict], prefetch: bool = True) -> dict:
+        """Run every pending job with at most `workers` jobs at once.
+
+        Args:
+            jobs (List[dict]): The job configurations, see `read_job_list`.
+            prefetch (bool, optional): Fetch the pages concurrently before handing them
+                to the workers. Otherwise each worker downloads its own page, with the
+                page cache's conditional requests. Defaults to True.
+
+        Returns:
+            dict: Count of the jobs per status over the whole run directory.
+        """
+        pending = self.pending(jobs)
+        config.logger.info(
+            f"Batch {self.run_dir}: {len(pending)} of {len(jobs)} jobs to run, "
+            f"{len(jobs) - len(pending)} already checkpointed"
+        )
+        with self._lock:
+            self._write_manifest()
+        jobs_by_url = {job["url"]: job for job in pending}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            if prefetch and pending:
+                futures = [
+                    executor.submit(
+                        self.run_job,
+                        jobs_by_url[result["url"]],
+                        result["text"],
+                        result["seconds"],
+                        result["error"],
+                    )
+                    for result in iter_fetched(jobs_by_url)
+                ]
+            else:
+                futures = [executor.submit(self.run_job, job) for job in pending]
+            concurrent.futures.wait(futures)
+        finally:
+            # On interrupt, drop queued jobs; running ones keep their "running" checkpoint.
+            executor.shutdown(wait=True, cancel_futures=True)
+        statuses = [record["status"] for record in self.records.values()]
+        return {status: statuses.count(status) for status in sorted(set(statuses))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tailor the resume to every job posting in a URL list, resuming interrupted runs."
+    )
+    parser.add_argument("jobs", help="Text file with one URL per line, or JSONL of {\"url\": ...} objects")
+    parser.add_argument("--run-dir", default=None, help="Folder of the manifest and checkpoints (defaults to BATCH_RUNS_PATH/<jobs file name>)")
+    parser.add_argument("--workers", type=int, default=None, help="Jobs processed at once (defaults to BATCH_MAX_WORKERS)")
+    parser.add_argument("--resume", default=None, help="Path to the resume YAML file")
+    parser.add_argument("--fast", action="store_true", default=None, help="Use the fast-mode prompts")
+    parser.add_argument("--skip-pdf", action="store_true", help="Only write the tailored resume.yaml")
+    parser.add_argument("--skip-failed", action="store_true", help="Do not retry jobs that failed in an earlier run")
+    parser.add_argument("--no-prefetch", action="store_true", help="Let each worker download its own page")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    run_dir = args.run_dir or os.path.join(
+        config.BATCH_RUNS_PATH, os.path.splitext(os.path.basename(args.jobs))[0]
+    )
+    runner = BatchRunner(
+        run_dir,
+        workers=args.workers,
+        resume_location=args.resume,
+        fast=args.fast,
+        skip_pdf_create=args.skip_pdf,
+        retry_failed=not args.skip_failed,
+    )
+    start = time.perf_counter()
+    counts = runner.run(read_job_list(args.jobs), prefetch=not args.no_prefetch)
+    print(json.dumps(counts))
+    print(
+        f"Finished in {time.perf_counter() - start:.1f}s, manifest: {runner.manifest_path}",
+        file=sys.stderr,
+    )
+    return 1 if counts.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
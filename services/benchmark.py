@@ -0,0 +1,127 @@
+import time
+import argparse
+import statistics
+import config
+from config import config as config_module
+from services.llm_usage import UsageLog
+
+MODES = (("full", False), ("fast", True))
+
+
+def _run_tailoring_calls(resume_improver, fast: bool, include_objective: bool = True):
+    """Make every tailoring LLM call once, one after another, in the given mode."""
+    resume_improver.extract_matched_skills(fast=fast)
+    if include_objective:
+        resume_improver.write_objective(fast=fast)
+    for section in (resume_improver.experiences or []) + (resume_improver.projects or []):
+        resume_improver.rewrite_section(section=section, fast=fast)
+
+
+def benchmark_fast_mode(resume_improver, repeats: int = 1, include_objective: bool = True) -> dict:
+    """Compare latency and token use of the full and fast prompt modes on one job.
+
+    Calls run sequentially with the local LLM response cache disabled, so every call
+    reaches the model and per-call latencies are not skewed by concurrency. Section
+    memoization is not involved since sections are rewritten directly.
+
+    Args:
+        resume_improver (ResumeImprover): An improver with a parsed job and resume.
+        repeats (int, optional): Number of runs per mode. Defaults to 1.
+        include_objective (bool, optional): Whether to include the objective call. Defaults to True.
+
+    Returns:
+        dict: Per mode, the mean wall time per run, the mean and median call latency, and the
+            prompt and completion tokens and cost per run.
+    """
+    results = {}
+    usage_log = resume_improver.usage_log
+    llm_kwargs = resume_improver.llm_kwargs
+    resume_improver.llm_kwargs = dict(llm_kwargs, cache=False)
+    try:
+        for mode, fast in MODES:
+            resume_improver.usage_log = UsageLog()
+            run_seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                _run_tailoring_calls(resume_improver, fast, include_objective)
+                run_seconds.append(time.perf_counter() - start)
+            records = resume_improver.usage_log.records
+            latencies = [record["latency_seconds"] for record in records]
+            results[mode] = dict(
+                calls=len(records) // repeats,
+                run_seconds=statistics.mean(run_seconds),
+                mean_call_seconds=statistics.mean(latencies) if latencies else 0.0,
+                median_call_seconds=statistics.median(latencies) if latencies else 0.0,
+                prompt_tokens=sum(r["prompt_tokens"] for r in records) / repeats,
+                completion_tokens=sum(r["completion_tokens"] for r in records) / repeats,
+                cost_usd=sum(r["cost_usd"] or 0.0 for r in records) / repeats,
+            )
+    finally:
+        resume_improver.usage_log = usage_log
+        resume_improver.llm_kwargs = llm_kwargs
+    return results
+
+
+def format_benchmark(results: dict) -> str:
+    """Format the output of `benchmark_fast_mode` as a table with fast/full ratios."""
+    fields = [
+        "calls",
+        "run_seconds",
+        "mean_call_seconds",
+        "median_call_seconds",
+        "prompt_tokens",
+        "completion_tokens",
+        "cost_usd",
+    ]
+    lines = [f"{'metric':<22}{'full':>12}{'fast':>12}{'fast/full':>12}"]
+    for field in fields:
+        full, fast = results["full"][field], results["fast"][field]
+        ratio = f"{fast / full:.2f}" if full else "-"
+        value_format = ">12.4f" if field.endswith(("seconds", "usd")) else ">12.0f"
+        lines.append(
+            f"{field:<22}{full:{value_format}}{fast:{value_format}}{ratio:>12}"
+        )
+    return "\n".join(lines)
+
+
+def _set_config(**values):
+    """Override configuration values on both the config package and its module."""
+    for key, value in values.items():
+        setattr(config, key, value)
+        setattr(config_module, key, value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare latency and token use of the full and fast prompt modes."
+    )
+    parser.add_argument("url", help="URL of the job posting to tailor the resume for")
+    parser.add_argument("--resume", help="Path to the resume YAML file")
+    parser.add_argument("--repeats", type=int, default=1, help="Runs per mode")
+    parser.add_argument(
+        "--fake",
+        action="store_true",
+        help="Use the offline fake chat model instead of the configured one",
+    )
+    parser.add_argument(
+        "--fake-seconds-per-token",
+        type=float,
+        default=0.01,
+        help="Latency per output token of the fake model",
+    )
+    args = parser.parse_args(argv)
+    if args.fake:
+        from services.fake_llm import FakeStructuredChatModel
+
+        _set_config(
+            CHAT_MODEL=FakeStructuredChatModel,
+            FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN=args.fake_seconds_per_token,
+        )
+    from services.resume_improver import ResumeImprover
+
+    resume_improver = ResumeImprover(args.url, resume_location=args.resume)
+    print(format_benchmark(benchmark_fast_mode(resume_improver, repeats=args.repeats)))
+
+
+if __name__ == "__main__":
+    main()
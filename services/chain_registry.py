@@ -0,0 +1,184 @@
+import threading
+from typing import Optional
+import httpx
+import openai
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.output_parsers.openai_tools import JsonOutputKeyToolsParser
+from langchain_core.runnables import Runnable
+import config
+from prompts import Prompts
+from services.langchain_helpers import create_llm
+from services.rate_limiter import rate_limiter
+
+_lock = threading.Lock()
+_http_client = None
+_llms = {}
+
+
+def _freeze(kwargs: dict) -> str:
+    """Return a hashable, order-independent key for keyword arguments."""
+    return repr(sorted(kwargs.items(), key=lambda item: item[0]))
+
+
+def _with_llm_defaults(kwargs: dict) -> dict:
+    """Fill in the `create_llm` defaults so equivalent arguments share one key."""
+    kwargs = dict(kwargs)
+    kwargs.setdefault("chat_model", config.CHAT_MODEL)
+    kwargs.setdefault("model_name", config.MODEL_NAME)
+    kwargs.setdefault("cache", config.LLM_CACHE_ENABLED)
+    return kwargs
+
+
+def get_http_client():
+    """Return the HTTP client shared by every pooled OpenAI chat model."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = openai.DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.LLM_HTTP_MAX_CONNECTIONS,
+                )
+            )
+        return _http_client
+
+
+def get_llm(**kwargs):
+    """Return a pooled LLM instance for the given `create_llm` arguments.
+
+    Instances are created once per distinct set of arguments and reused afterwards.
+    Chat models that accept an `http_client` share a single connection pool, so calls
+    reuse open connections instead of repeating the TLS handshake.
+
+    Returns:
+        BaseChatModel: The pooled LLM instance.
+    """
+    kwargs = _with_llm_defaults(kwargs)
+    key = _freeze(kwargs)
+    with _lock:
+        llm = _llms.get(key)
+    if llm is not None:
+        return llm
+    model_fields = getattr(kwargs["chat_model"], "model_fields", {})
+    if "http_client" in model_fields:
+        kwargs.setdefault("http_client", get_http_client())
+    if "rate_limiter" in model_fields:
+        # Reserves on the shared limiter after the response cache lookup, so hits are free.
+        kwargs.setdefault("rate_limiter", rate_limiter.model_limiter())
+    llm = create_llm(**kwargs)
+    with _lock:
+        return _llms.setdefault(key, llm)
+
+
+class CompiledChain:
+    """A chain built once together with the input names its prompt requires."""
+
+    def __init__(
+        self,
+        prompt_type: Optional[str],
+        runnable: Runnable,
+        pydantic_object=None,
+        llm_kwargs: dict = None,
+    ):
+        """Initialize the CompiledChain.
+
+        Args:
+            prompt_type (str, optional): The `Prompts.lookup` key the chain was built from.
+            runnable (Runnable): The chain.
+            pydantic_object (optional): The output schema of the chain.
+            llm_kwargs (dict, optional): The `get_llm` arguments of the model step.
+        """
+        self.prompt_type = prompt_type
+        self.runnable = runnable
+        self.pydantic_object = pydantic_object
+        self.llm_kwargs = llm_kwargs or {}
+        input_schema = runnable.get_input_schema()
+        # Pydantic v2 schemas (langchain-core 0.3+) renamed `schema()` to `model_json_schema()`.
+        schema = getattr(input_schema, "model_json_schema", input_schema.schema)()
+        self.required_inputs = list(schema.get("required") or [])
+
+    def invoke(self, *args, **kwargs):
+        return self.runnable.invoke(*args, **kwargs)
+
+    def stream(self, *args, **kwargs):
+        return self.runnable.stream(*args, **kwargs)
+
+
+class ChainRegistry:
+    """Cache of compiled chains keyed by prompt type, output schema and LLM arguments."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains = {}
+
+    def get(
+        self,
+        prompt_type: Optional[str],
+        pydantic_object,
+        llm_kwargs: dict = None,
+        streaming: bool = False,
+    ) -> CompiledChain:
+        """Return the compiled chain for a prompt and output schema, building it once.
+
+        Args:
+            prompt_type (str, optional): The `Prompts.lookup` key of the prompt. None builds a
+                chain without a prompt that takes the model input directly.
+            pydantic_object: The output schema.
+            llm_kwargs (dict, optional): Arguments for `get_llm`.
+            streaming (bool, optional): Build a chain that streams partial output as dicts
+                instead of returning a validated object. Defaults to False.
+
+        Returns:
+            CompiledChain: The compiled chain.
+        """
+        llm_kwargs = _with_llm_defaults(llm_kwargs or {})
+        prompt_msgs = Prompts.lookup[prompt_type] if prompt_type else None
+        key = (prompt_type, pydantic_object, _freeze(llm_kwargs), streaming)
+        with self._lock:
+            entry = self._chains.get(key)
+        # Reloading the prompts replaces the message lists, which invalidates the chain.
+        if entry is not None and entry[0] is prompt_msgs:
+            return entry[1]
+        chain = CompiledChain(
+            prompt_type,
+            self._build(prompt_msgs, pydantic_object, llm_kwargs, streaming),
+            pydantic_object,
+            llm_kwargs,
+        )
+        with self._lock:
+            self._chains[key] = (prompt_msgs, chain)
+        return chain
+
+    def _build(self, prompt_msgs, pydantic_object, llm_kwargs: dict, streaming: bool) -> Runnable:
+        """Build a chain whose model step goes through the shared rate limiter.
+
+        The streaming variant binds the schema as a forced tool call and parses the tool
+        arguments incrementally, since `with_structured_output` only emits an object once
+        it validates. Streamed calls do not go through the local LLM response cache.
+        """
+        if streaming and "stream_usage" in getattr(llm_kwargs["chat_model"], "model_fields", {}):
+            llm_kwargs = dict(llm_kwargs, stream_usage=True)
+        llm = get_llm(**llm_kwargs)
+        reserve_in_model = getattr(llm, "rate_limiter", None) is not None
+        if streaming:
+            tool_name = pydantic_object.__name__
+            runnable = rate_limiter.wrap(
+                llm.bind_tools([pydantic_object], tool_choice=tool_name),
+                reserve_in_model=reserve_in_model,
+            ) | JsonOutputKeyToolsParser(key_name=tool_name, first_tool_only=True)
+        else:
+            runnable = rate_limiter.wrap(
+                llm.with_structured_output(schema=pydantic_object),
+                reserve_in_model=reserve_in_model,
+            )
+        if prompt_msgs is not None:
+            runnable = ChatPromptTemplate(messages=prompt_msgs) | runnable
+        return runnable
+
+    def clear(self):
+        """Drop every compiled chain, for example after changing the model configuration."""
+        with self._lock:
+            self._chains.clear()
+
+
+chain_registry = ChainRegistry()
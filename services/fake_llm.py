@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from typing import Any, Iterator, Optional, Sequence
+from pydantic import Field, PrivateAttr
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+import config
+from services.llm_usage import estimate_tokens
+
+STREAM_CHUNK_CHARS = 24
+
+
+def _bind_openai_tools(model: BaseChatModel, tools: Sequence, tool_choice=None, **kwargs):
+    """Bind tools to `model` in the OpenAI tool format, as `ChatOpenAI.bind_tools` does."""
+    kwargs.pop("ls_structured_output_format", None)
+    formatted_tools = [convert_to_openai_tool(tool) for tool in tools]
+    if tool_choice == "any":
+        tool_choice = "required"
+    elif isinstance(tool_choice, str) and tool_choice not in ("auto", "none", "required"):
+        tool_choice = {"type": "function", "function": {"name": tool_choice}}
+    if tool_choice is not None:
+        kwargs["tool_choice"] = tool_choice
+    return model.bind(tools=formatted_tools, **kwargs)
+
+
+def _messages_text(messages: list[BaseMessage]) -> str:
+    return "\n".join(str(message.content) for message in messages)
+
+
+def synthesize_from_schema(schema: dict, rng: random.Random, name: str = "value", defs: dict = None):
+    """Build a value that validates against a JSON schema.
+
+    Args:
+        schema (dict): The JSON schema (or sub-schema) to satisfy.
+        rng (random.Random): Source of randomness, seeded for reproducible output.
+        name (str, optional): Name of the property being built, used in placeholder text.
+        defs (dict, optional): Schema definitions referenced through `$ref`.
+
+    Returns:
+        The synthesized value.
+    """
+    defs = defs if defs is not None else schema.get("$defs") or schema.get("definitions") or {}
+    if "$ref" in schema:
+        return synthesize_from_schema(defs[schema["$ref"].split("/")[-1]], rng, name, defs)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return synthesize_from_schema(options[0], rng, name, defs)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    schema_type = schema.get("type", "object" if "properties" in schema else "string")
+    if schema_type == "object":
+        return {
+            key: synthesize_from_schema(sub_schema, rng, key, defs)
+            for key, sub_schema in (schema.get("properties") or {}).items()
+        }
+    if schema_type == "array":
+        count = max(schema.get("minItems", 0), rng.randint(2, 4))
+        return [
+            synthesize_from_schema(schema.get("items") or {}, rng, name, defs)
+            for _ in range(count)
+        ]
+    if schema_type == "integer":
+        return rng.randint(schema.get("minimum", 1), schema.get("maximum", 5))
+    if schema_type == "number":
+        return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1)), 3)
+    if schema_type == "boolean":
+        return rng.random() < 0.5
+    return f"Sample {name.replace('_', ' ')} {rng.randint(1, 999)}"
+
+
+class FakeStructuredChatModel(BaseChatModel):
+    """Deterministic offline chat model for benchmarks and load tests.
+
+    Supports `with_structured_output` for any Pydantic schema by answering with a tool
+    call whose arguments are synthesized from the schema. Output depends only on the
+    input messages, and each call sleeps for `latency` +/- `jitter` seconds, plus
+    `seconds_per_output_token` for every output token, to stand in for network and
+    generation time. Streaming splits the same response into
+    small chunks and spreads that delay across them.
+    """
+
+    model_name: str = Field(default="fake-structured", alias="model")
+    temperature: Optional[float] = None
+    latency: float = Field(default_factory=lambda: config.FAKE_LLM_LATENCY)
+    jitter: float = Field(default_factory=lambda: config.FAKE_LLM_JITTER)
+    seconds_per_output_token: float = Field(
+        default_factory=lambda: config.FAKE_LLM_SECONDS_PER_OUTPUT_TOKEN
+    )
+
+    model_config = {"populate_by_name": True}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-structured"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return dict(model_name=self.model_name, temperature=self.temperature)
+
+    def bind_tools(self, tools: Sequence, *, tool_choice=None, **kwargs):
+        return _bind_openai_tools(self, tools, tool_choice=tool_choice, **kwargs)
+
+    def _delay(self, completion_tokens: int) -> float:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay + completion_tokens * self.seconds_per_output_token)
+
+    def _respond(self, messages: list[BaseMessage], tools: Optional[list]):
+        """Build the response message and token usage for `messages`."""
+        prompt_text = _messages_text(messages)
+        seed = hashlib.sha256((prompt_text + json.dumps(tools or [])).encode()).hexdigest()
+        rng = random.Random(seed)
+        if tools:
+            function = tools[0]["function"]
+            arguments = synthesize_from_schema(function.get("parameters") or {}, rng)
+            output_text = json.dumps(arguments)
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    dict(name=function["name"], args=arguments, id=f"call_{seed[:24]}")
+                ],
+            )
+        else:
+            output_text = f"Sample response {rng.randint(1, 999)}"
+            message = AIMessage(content=output_text)
+        prompt_tokens = estimate_tokens(prompt_text + json.dumps(tools or []))
+        completion_tokens = estimate_tokens(output_text)
+        message.usage_metadata = dict(
+            input_tokens=prompt_tokens,
+            output_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        )
+        return message, output_text
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        tools: Optional[list] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message, _ = self._respond(messages, tools)
+        usage = message.usage_metadata
+        delay = self._delay(usage["output_tokens"])
+        if delay > 0:
+            time.sleep(delay)
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output=dict(
+                model_name=self.model_name,
+                token_usage=dict(
+                    prompt_tokens=usage["input_tokens"],
+                    completion_tokens=usage["output_tokens"],
+                    total_tokens=usage["total_tokens"],
+                ),
+            ),
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        tools: Optional[list] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Stream the response in pieces, spreading the latency across them."""
+        message, output_text = self._respond(messages, tools)
+        pieces = [
+            output_text[i : i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(output_text), STREAM_CHUNK_CHARS)
+        ]
+        delay = self._delay(message.usage_metadata["output_tokens"]) / max(1, len(pieces))
+        tool_call = message.tool_calls[0] if message.tool_calls else None
+        for i, piece in enumerate(pieces):
+            if delay > 0:
+                time.sleep(delay)
+            if tool_call is None:
+                chunk = AIMessageChunk(content=piece)
+            else:
+                chunk = AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        dict(
+                            name=tool_call["name"] if i == 0 else None,
+                            args=piece,
+                            id=tool_call["id"] if i == 0 else None,
+                            index=0,
+                        )
+                    ],
+                )
+            yield ChatGenerationChunk(message=chunk)
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=message.usage_metadata)
+        )
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records real responses to a cassette file and replays them.
+
+    In "record" mode every call goes to `inner` (by default a `ChatOpenAI` with the same
+    model name and temperature) and its response is stored. In "replay" mode responses
+    are served from the cassette and a missing entry raises `KeyError`. "auto" replays
+    what it has and records the rest. Entries are keyed by the input messages and the
+    bound tools, so one cassette can serve every chain of the pipeline.
+    """
+
+    model_name: str = Field(default_factory=lambda: config.MODEL_NAME, alias="model")
+    temperature: Optional[float] = None
+    cassette_path: str = Field(default_factory=lambda: config.CASSETTE_PATH)
+    mode: str = Field(default_factory=lambda: config.CASSETTE_MODE)
+    inner: Optional[BaseChatModel] = None
+    latency: float = 0.0
+
+    model_config = {"populate_by_name": True}
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _entries: Optional[dict] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return dict(model_name=self.model_name, temperature=self.temperature)
+
+    def bind_tools(self, tools: Sequence, *, tool_choice=None, **kwargs):
+        return _bind_openai_tools(self, tools, tool_choice=tool_choice, **kwargs)
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.cassette_path):
+                with open(self.cassette_path, "r") as file:
+                    self._entries = json.load(file)
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cassette_path) or ".", exist_ok=True)
+        with open(self.cassette_path, "w") as file:
+            json.dump(self._entries, file, indent=2)
+
+    def _key(self, messages: list[BaseMessage], kwargs: dict) -> str:
+        payload = dict(
+            model=self.model_name,
+            messages=[message_to_dict(m) for m in messages],
+            tools=kwargs.get("tools"),
+            tool_choice=kwargs.get("tool_choice"),
+        )
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _record(self, messages: list[BaseMessage], stop, kwargs: dict) -> AIMessage:
+        if self.inner is None:
+            from langchain_openai import ChatOpenAI
+
+            self.inner = ChatOpenAI(
+                model_name=self.model_name, temperature=self.temperature, cache=False
+            )
+        return self.inner.invoke(messages, stop=stop, **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = self._key(messages, kwargs)
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None:
+            if self.mode == "replay":
+                raise KeyError(
+                    f"No cassette entry for this call in {self.cassette_path}; "
+                    f"record it first with mode='record' or 'auto'."
+                )
+            message = self._record(messages, stop, kwargs)
+            entry = dict(message=message_to_dict(message), model_name=self.model_name)
+            with self._lock:
+                self._load()[key] = entry
+                self._save()
+        elif self.latency:
+            time.sleep(self.latency)
+        message = messages_from_dict([entry["message"]])[0]
+        usage = getattr(message, "usage_metadata", None) or {}
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output=dict(
+                model_name=entry["model_name"],
+                token_usage=dict(
+                    prompt_tokens=usage.get("input_tokens", 0),
+                    completion_tokens=usage.get("output_tokens", 0),
+                    total_tokens=usage.get("total_tokens", 0),
+                ),
+            ),
+        )
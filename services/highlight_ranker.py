@@ -0,0 +1,77 @@
+import math
+from collections import Counter
+from typing import Iterable, List, Tuple
+from services.job_similarity import TOKEN_PATTERN
+
+JOB_QUERY_FIELDS = ["ats_keywords", "technical_skills", "duties"]
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case `text` and split it into word tokens, keeping terms like c++ or node.js."""
+    return [token.rstrip(".") for token in TOKEN_PATTERN.findall(str(text).lower())]
+
+
+def job_query_terms(parsed_job: dict) -> Counter:
+    """Return the query terms of a parsed job, from its ATS keywords, technical skills and duties."""
+    terms = Counter()
+    for field in JOB_QUERY_FIELDS:
+        value = parsed_job.get(field) or []
+        for item in value if isinstance(value, (list, tuple)) else [value]:
+            terms.update(tokenize(item))
+    return terms
+
+
+class HighlightRanker:
+    """Okapi BM25 scorer of resume highlights against a parsed job.
+
+    Document frequencies and the average length come from `corpus`, normally every
+    highlight of the base resume, so a term that appears in most highlights counts
+    for little. Query terms repeated across the job fields weigh more.
+    """
+
+    def __init__(self, parsed_job: dict, corpus: Iterable[str]):
+        """Initialize the ranker.
+
+        Args:
+            parsed_job (dict): The parsed job to score against.
+            corpus (Iterable[str]): The highlights that set the term statistics.
+        """
+        self.query = job_query_terms(parsed_job)
+        documents = [tokenize(text) for text in corpus]
+        self.n_documents = max(1, len(documents))
+        self.average_length = sum(len(d) for d in documents) / self.n_documents or 1.0
+        self.document_frequency = Counter(
+            term for document in documents for term in set(document)
+        )
+
+    def _idf(self, term: str) -> float:
+        df = self.document_frequency.get(term, 0)
+        return math.log(1.0 + (self.n_documents - df + 0.5) / (df + 0.5))
+
+    def score(self, highlight: str) -> float:
+        """Return the BM25 score of one highlight."""
+        counts = Counter(tokenize(highlight))
+        length_norm = BM25_K1 * (
+            1.0 - BM25_B + BM25_B * sum(counts.values()) / self.average_length
+        )
+        score = 0.0
+        for term, query_count in self.query.items():
+            tf = counts.get(term)
+            if tf:
+                score += (
+                    query_count * self._idf(term) * tf * (BM25_K1 + 1) / (tf + length_norm)
+                )
+        return score
+
+    def rank(self, highlights: List[str]) -> List[Tuple[str, float]]:
+        """Return the highlights with their scores, best first. Ties keep the input order."""
+        scored = [(highlight, self.score(highlight)) for highlight in highlights]
+        return sorted(scored, key=lambda item: -item[1])
+
+    def top(self, highlights: List[str], n: int) -> List[str]:
+        """Return the `n` best-scoring highlights, best first, or all of them if `n` is None."""
+        if n is None or len(highlights) <= n:
+            return list(highlights)
+        return [highlight for highlight, _ in self.rank(highlights)[:n]]
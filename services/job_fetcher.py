@@ -0,0 +1,213 @@
+import time
+import asyncio
+import threading
+import queue
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+import httpx
+import requests
+from fp.fp import FreeProxy
+import config
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def get_session() -> requests.Session:
+    """Return the `requests` session shared by single-URL downloads, so connections are reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(config.REQUESTS_HEADERS)
+        return _session
+
+
+def _fetch_result(url: str, started: float, attempts: int, response=None, error=None) -> dict:
+    return dict(
+        url=url,
+        ok=error is None,
+        status=response.status_code if response is not None else None,
+        text=response.text if response is not None and error is None else None,
+        error=error,
+        attempts=attempts,
+        seconds=time.perf_counter() - started,
+    )
+
+
+class AsyncJobFetcher:
+    """Fetch many job postings concurrently over one pooled HTTP client.
+
+    Requests to the same host are capped at `config.FETCH_PER_HOST_LIMIT` at once.
+    A 429 answer is retried up to `config.MAX_RETRIES` times after waiting
+    `config.BACKOFF_FACTOR * 2 ** attempt` seconds, and later attempts for that URL go
+    through a free proxy, like `ResumeImprover._download_url`, or directly when no proxy
+    can be found. Other errors fail the URL without retrying, and never the other URLs.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = None,
+        per_host_limit: int = None,
+        timeout: float = None,
+    ):
+        """Initialize the AsyncJobFetcher.
+
+        Args:
+            max_connections (int, optional): Size of the connection pool. Defaults to `config.FETCH_MAX_CONNECTIONS`.
+            per_host_limit (int, optional): Concurrent requests per host. Defaults to `config.FETCH_PER_HOST_LIMIT`.
+            timeout (float, optional): Seconds per request. Defaults to `config.FETCH_TIMEOUT_SECONDS`.
+        """
+        self.max_connections = max_connections or config.FETCH_MAX_CONNECTIONS
+        self.per_host_limit = per_host_limit or config.FETCH_PER_HOST_LIMIT
+        self.timeout = timeout or config.FETCH_TIMEOUT_SECONDS
+        self._host_semaphores = {}
+
+    def _client(self, proxy: str = None) -> httpx.AsyncClient:
+        # httpx decodes gzip and deflate, and brotli when the brotli package is installed.
+        return httpx.AsyncClient(
+            headers=config.REQUESTS_HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            proxy=proxy,
+        )
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> dict:
+        """Fetch one URL with the 429 backoff and proxy fallback.
+
+        Returns:
+            dict: `url`, `ok`, HTTP `status`, the page `text`, the `error` message if it
+                failed, the number of `attempts` and the elapsed `seconds`.
+        """
+        started = time.perf_counter()
+        proxy_client = None
+        response = None
+        attempt = 0
+        try:
+            for attempt in range(config.MAX_RETRIES):
+                try:
+                    async with self._host_semaphore(url):
+                        response = await (proxy_client or client).get(url)
+                    response.raise_for_status()
+                    return _fetch_result(url, started, attempt + 1, response)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code != 429:
+                        config.logger.error(f"Failed to download URL {url}: {e}")
+                        return _fetch_result(url, started, attempt + 1, response, str(e))
+                    delay = config.BACKOFF_FACTOR * 2**attempt
+                    config.logger.warning(
+                        f"Rate limit exceeded for {url}. Retrying in {delay} seconds..."
+                    )
+                    # The host slot is released while waiting, so other URLs keep going.
+                    await asyncio.sleep(delay)
+                    if proxy_client is None:
+                        try:
+                            proxy = await asyncio.to_thread(FreeProxy(rand=True).get)
+                        except Exception as e:
+                            config.logger.warning(
+                                f"No free proxy available for {url}, retrying directly: {e!r}"
+                            )
+                        else:
+                            proxy_client = self._client(proxy)
+                except httpx.HTTPError as e:
+                    config.logger.error(f"Failed to download URL {url}: {e!r}")
+                    return _fetch_result(url, started, attempt + 1, None, repr(e))
+        except Exception as e:
+            # Any other failure only fails this URL, never the rest of the batch.
+            config.logger.error(f"Failed to download URL {url}: {e!r}")
+            return _fetch_result(url, started, attempt + 1, response, repr(e))
+        finally:
+            if proxy_client is not None:
+                await proxy_client.aclose()
+        config.logger.error(f"Exceeded maximum retries for URL {url}")
+        return _fetch_result(
+            url, started, config.MAX_RETRIES, response, "Exceeded maximum retries"
+        )
+
+    async def fetch_as_completed(self, urls: Iterable[str]) -> AsyncIterator[dict]:
+        """Fetch every URL concurrently, yielding each result as soon as it is done.
+
+        Args:
+            urls (Iterable[str]): The URLs to fetch. Duplicates are fetched once.
+
+        Yields:
+            dict: The result of `fetch` for each distinct URL, in completion order.
+        """
+        self._host_semaphores = {}
+        async with self._client() as client:
+            tasks = [asyncio.create_task(self.fetch(client, url)) for url in dict.fromkeys(urls)]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+def iter_fetched(urls: Iterable[str], **fetcher_kwargs) -> Iterator[dict]:
+    """Fetch URLs concurrently from synchronous code, yielding results as they complete.
+
+    The event loop runs on a helper thread, so this also works from threads that
+    already run a loop, such as Streamlit scripts.
+
+    Args:
+        urls (Iterable[str]): The URLs to fetch.
+        **fetcher_kwargs: Arguments for `AsyncJobFetcher`.
+
+    Yields:
+        dict: See `AsyncJobFetcher.fetch`.
+    """
+    results = queue.Queue()
+    done = object()
+
+    async def produce():
+        async for result in AsyncJobFetcher(**fetcher_kwargs).fetch_as_completed(urls):
+            results.put(result)
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except Exception as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    threading.Thread(target=run, daemon=True).start()
+    while True:
+        item = results.get()
+        if item is done:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def fetch_urls(
+    urls: Iterable[str], on_result: Optional[Callable[[dict], None]] = None, **fetcher_kwargs
+) -> Dict[str, dict]:
+    """Fetch URLs concurrently and return the results keyed by URL.
+
+    Args:
+        urls (Iterable[str]): The URLs to fetch.
+        on_result (Callable[[dict], None], optional): Called with each result as it completes.
+        **fetcher_kwargs: Arguments for `AsyncJobFetcher`.
+
+    Returns:
+        Dict[str, dict]: See `AsyncJobFetcher.fetch`.
+    """
+    results = {}
+    for result in iter_fetched(urls, **fetcher_kwargs):
+        results[result["url"]] = result
+        if on_result is not None:
+            on_result(result)
+    return results
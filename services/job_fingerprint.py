@@ -0,0 +1,231 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+import numpy as np
+import config
+from services.highlight_ranker import tokenize
+from services.page_cache import normalize_url
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+BIT_POSITIONS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+# Leading lines of a posting that usually hold its title, company and location
+HEADER_LINES = 5
+LOCATION_LINE = re.compile(
+    r"\b(location|based in|remote|hybrid|on-?site|in-?office|relocat\w*)\b", re.IGNORECASE
+)
+MONEY_FIGURE = re.compile(
+    r"(?:[$€£]\s?\d[\d,.]*\s?[kK]?|\d[\d,.]*\s?[kK]?\s?(?:USD|EUR|GBP|CAD|AUD))"
+)
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """Return the 64-bit SimHash of the word 3-shingles of `text`.
+
+    Texts that share most of their shingles get fingerprints that differ in only a
+    few bits, so near-duplicate postings can be found by Hamming distance.
+    """
+    tokens = tokenize(text)
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [
+            " ".join(tokens[i : i + SHINGLE_SIZE])
+            for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ]
+    hashes = np.fromiter((_shingle_hash(s) for s in shingles), dtype=np.uint64, count=len(shingles))
+    bits = (hashes[:, None] >> BIT_POSITIONS) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int(np.sum((votes > 0).astype(np.uint64) << BIT_POSITIONS))
+
+
+def _normalize_line(line: str) -> str:
+    return " ".join(line.lower().split())
+
+
+def job_header(text: str) -> dict:
+    """Collect the parts of a job text that tell apart postings of one template.
+
+    The same requisition reposted for another city, level or pay band keeps almost
+    all of its text, so its SimHash can fall within the duplicate threshold. The
+    leading lines, the lines naming a location or work arrangement and the money
+    figures differ between such postings and are compared before a duplicate is reused.
+
+    Args:
+        text (str): The extracted job text.
+
+    Returns:
+        dict: The normalized `head` lines, `location` lines and `pay` figures.
+    """
+    lines = [_normalize_line(line) for line in (text or "").splitlines() if line.strip()]
+    return dict(
+        head=lines[:HEADER_LINES],
+        location=sorted({line for line in lines if LOCATION_LINE.search(line)}),
+        pay=sorted({re.sub(r"[\s,]", "", figure) for figure in MONEY_FIGURE.findall(text or "")}),
+    )
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits of two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+def _signed(value: int) -> int:
+    """Map an unsigned 64-bit value onto SQLite's signed INTEGER range."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class JobFingerprintIndex:
+    """SQLite index of job text SimHashes for near-duplicate lookup.
+
+    The 64 fingerprint bits are split into `max_distance + 1` bands. Two fingerprints
+    within `max_distance` bits must agree exactly on at least one band, so a lookup only
+    verifies the postings that share a band value with the query, found through an
+    indexed table, and its cost does not grow with the number of stored postings.
+    """
+
+    def __init__(self, database_path: str = None, max_distance: int = None):
+        """Initialize the index and create its tables if needed.
+
+        Args:
+            database_path (str, optional): Path to the SQLite file. Defaults to `config.NEAR_DUPLICATE_PATH`.
+            max_distance (int, optional): Largest Hamming distance counted as a duplicate.
+                Defaults to `config.NEAR_DUPLICATE_MAX_HAMMING`.
+        """
+        self.database_path = database_path or config.NEAR_DUPLICATE_PATH
+        self.max_distance = (
+            max_distance if max_distance is not None else config.NEAR_DUPLICATE_MAX_HAMMING
+        )
+        self.band_count = min(SIMHASH_BITS, self.max_distance + 1)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_fingerprints (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                simhash INTEGER NOT NULL,
+                job_location TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                header TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS job_fingerprint_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (band, value, key)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_fingerprint_meta (name TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._rebuild_bands_if_needed()
+        self._conn.commit()
+
+    def _bands(self, fingerprint: int) -> list[tuple[int, int]]:
+        """Split a fingerprint into `(band, value)` pairs of near-equal width."""
+        bands = []
+        start = 0
+        for band in range(self.band_count):
+            width = SIMHASH_BITS // self.band_count + (band < SIMHASH_BITS % self.band_count)
+            bands.append((band, _signed((fingerprint >> start) & ((1 << width) - 1))))
+            start += width
+        return bands
+
+    def _rebuild_bands_if_needed(self):
+        """Re-band every stored fingerprint when the configured threshold has changed."""
+        row = self._conn.execute(
+            "SELECT value FROM job_fingerprint_meta WHERE name = 'band_count'"
+        ).fetchone()
+        if row is not None and int(row[0]) == self.band_count:
+            return
+        self._conn.execute("DELETE FROM job_fingerprint_bands")
+        rows = self._conn.execute("SELECT key, simhash FROM job_fingerprints").fetchall()
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO job_fingerprint_bands VALUES (?, ?, ?)",
+            [
+                (band, value, key)
+                for key, fingerprint in rows
+                for band, value in self._bands(_unsigned(fingerprint))
+            ],
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO job_fingerprint_meta VALUES ('band_count', ?)",
+            (str(self.band_count),),
+        )
+
+    def find(self, text: str, exclude_url: str = None) -> Optional[dict]:
+        """Find the stored posting closest to `text` within the Hamming threshold.
+
+        Args:
+            text (str): The extracted job text.
+            exclude_url (str, optional): A URL whose own entry should not count as a match.
+
+        Returns:
+            dict: The match's `url`, `job_location`, `distance` and `header` (see
+                `job_header`), or None.
+        """
+        fingerprint = simhash(text)
+        exclude_key = normalize_url(exclude_url) if exclude_url else None
+        clauses = " OR ".join(["(b.band = ? AND b.value = ?)"] * self.band_count)
+        params = [item for pair in self._bands(fingerprint) for item in pair]
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT DISTINCT f.key, f.url, f.simhash, f.job_location, f.header
+                FROM job_fingerprint_bands b JOIN job_fingerprints f ON f.key = b.key
+                WHERE {clauses}""",
+                params,
+            ).fetchall()
+        best = None
+        for key, url, stored, job_location, header in rows:
+            if key == exclude_key:
+                continue
+            distance = hamming_distance(fingerprint, _unsigned(stored))
+            if distance <= self.max_distance and (best is None or distance < best["distance"]):
+                best = dict(
+                    url=url,
+                    job_location=job_location,
+                    distance=distance,
+                    header=json.loads(header),
+                )
+        return best
+
+    def add(self, url: str, text: str, job_location: str):
+        """Store the fingerprint and header of a posting and the folder holding its parse and resume."""
+        key = normalize_url(url)
+        fingerprint = simhash(text)
+        header = json.dumps(job_header(text))
+        with self._lock:
+            self._conn.execute("DELETE FROM job_fingerprint_bands WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (key, url, _signed(fingerprint), job_location, time.time(), header),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO job_fingerprint_bands VALUES (?, ?, ?)",
+                [(band, value, key) for band, value in self._bands(fingerprint)],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM job_fingerprints").fetchone()[0]
+
+
+job_fingerprint_index = JobFingerprintIndex()
@@ -0,0 +1,221 @@
+import os
+import re
+import json
+import math
+import time
+import zlib
+import hashlib
+import threading
+from collections import Counter
+from typing import Optional, Tuple
+import config
+import utils
+
+TAILORING_FILENAME = "tailoring.json"
+JOB_TEXT_FIELDS = [
+    "job_title",
+    "team",
+    "job_summary",
+    "duties",
+    "qualifications",
+    "ats_keywords",
+    "technical_skills",
+    "non_technical_skills",
+]
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def resume_hash(resume: dict) -> str:
+    """Return a SHA-256 digest of the base resume, used to only reuse drafts of the same resume."""
+    serialized = json.dumps(resume, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def tailoring_digest(settings: dict) -> str:
+    """Return a SHA-256 digest of the prompts, models and options a tailoring run used.
+
+    Stored outputs are only reused by a run with the same digest, so editing a prompt,
+    rerouting a model or changing how sections are rewritten never serves stale drafts.
+    """
+    serialized = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def job_text(parsed_job: dict) -> str:
+    """Flatten the descriptive fields of a parsed job into one text."""
+    parts = []
+    for field in JOB_TEXT_FIELDS:
+        value = parsed_job.get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value if v)
+        elif value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def hashed_term_counts(text: str, n_features: int = None) -> Counter:
+    """Count the unigrams and bigrams of `text`, hashed into `n_features` buckets.
+
+    CRC32 is used instead of `hash()` so bucket ids are stable across processes.
+    """
+    n_features = n_features or config.SEMANTIC_REUSE_FEATURES
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return Counter(zlib.crc32(term.encode("utf-8")) % n_features for term in terms)
+
+
+def tfidf_vector(counts: Counter, idf: dict) -> dict:
+    """Weight term counts with sublinear TF and `idf`, then L2-normalize them."""
+    vector = {
+        term: (1.0 + math.log(count)) * idf.get(term, 1.0)
+        for term, count in counts.items()
+    }
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return {}
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+def cosine(a: dict, b: dict) -> float:
+    """Return the cosine similarity of two L2-normalized sparse vectors."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+class JobSimilarityIndex:
+    """Hashed TF-IDF index over the parsed jobs under `DATA_PATH`.
+
+    Only jobs whose folder holds a `tailoring.json`, written after their tailoring
+    stages ran, are indexed. The IDF weights are computed over the indexed jobs plus
+    the query, so terms shared by every posting (boilerplate) count for little.
+    """
+
+    def __init__(self, data_path: str = None, n_features: int = None):
+        """Initialize the index.
+
+        Args:
+            data_path (str, optional): Folder holding one subfolder per job. Defaults to
+                `config.DATA_PATH` at load time.
+            n_features (int, optional): Number of hash buckets. Defaults to `config.SEMANTIC_REUSE_FEATURES`.
+        """
+        self.data_path = data_path
+        self.n_features = n_features or config.SEMANTIC_REUSE_FEATURES
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "JobSimilarityIndex":
+        """Scan the job folders, re-reading only jobs whose files changed since the last scan."""
+        with self._lock:
+            self._entries = self._scan(self.data_path or config.DATA_PATH)
+        return self
+
+    def _scan(self, data_path: str) -> dict:
+        entries = {}
+        if os.path.isdir(data_path):
+            for name in os.listdir(data_path):
+                job_location = os.path.join(data_path, name)
+                job_file = os.path.join(job_location, "job.yaml")
+                tailoring_file = os.path.join(job_location, TAILORING_FILENAME)
+                if not (os.path.isfile(job_file) and os.path.isfile(tailoring_file)):
+                    continue
+                mtime = max(os.path.getmtime(job_file), os.path.getmtime(tailoring_file))
+                entry = self._entries.get(job_location)
+                if entry is None or entry["mtime"] != mtime:
+                    entry = self._read_entry(job_file, tailoring_file, mtime)
+                if entry is not None:
+                    entries[job_location] = entry
+        return entries
+
+    def _read_entry(self, job_file: str, tailoring_file: str, mtime: float) -> Optional[dict]:
+        try:
+            parsed_job = utils.read_yaml(filename=job_file) or {}
+            with open(tailoring_file, "r", encoding="utf-8") as f:
+                tailoring = json.load(f)
+        except (OSError, ValueError) as e:
+            config.logger.warning(f"Skipping {job_file} in the similarity index: {e}")
+            return None
+        return dict(
+            mtime=mtime,
+            counts=hashed_term_counts(job_text(parsed_job), self.n_features),
+            resume_hash=tailoring.get("resume_hash"),
+            fast=tailoring.get("fast"),
+            config_digest=tailoring.get("config_digest"),
+            outputs=tailoring.get("outputs", {}),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def most_similar(
+        self,
+        parsed_job: dict,
+        resume_digest: str = None,
+        fast: bool = None,
+        required_outputs=(),
+        config_digest: str = None,
+        exclude_location: str = None,
+    ) -> Tuple[Optional[str], float, Optional[dict]]:
+        """Find the indexed job most similar to `parsed_job` whose tailoring can be reused.
+
+        Args:
+            parsed_job (dict): The parsed job to match.
+            resume_digest (str, optional): Only consider jobs tailored from this `resume_hash`.
+            fast (bool, optional): Only consider jobs tailored in this prompt mode.
+            required_outputs (Iterable[str], optional): Stage outputs the match must hold.
+            config_digest (str, optional): Only consider jobs tailored with this
+                `tailoring_digest`.
+            exclude_location (str, optional): Job folder to leave out, usually the job's own
+                folder, which would otherwise match itself when the job is tailored again.
+
+        Returns:
+            tuple: The job folder, its cosine similarity and its stored stage outputs, or
+                `(None, 0.0, None)` if no job qualifies.
+        """
+        with self._lock:
+            entries = dict(self._entries)
+        if exclude_location is not None:
+            exclude_location = os.path.abspath(exclude_location)
+        candidates = {
+            location: entry
+            for location, entry in entries.items()
+            if os.path.abspath(location) != exclude_location
+            and (resume_digest is None or entry["resume_hash"] == resume_digest)
+            and (config_digest is None or entry["config_digest"] == config_digest)
+            and (fast is None or bool(entry["fast"]) == bool(fast))
+            and all(key in entry["outputs"] for key in required_outputs)
+        }
+        if not candidates:
+            return None, 0.0, None
+        query = hashed_term_counts(job_text(parsed_job), self.n_features)
+        documents = [entry["counts"] for entry in candidates.values()] + [query]
+        document_frequency = Counter(term for counts in documents for term in counts)
+        idf = {
+            term: math.log((1 + len(documents)) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+        query_vector = tfidf_vector(query, idf)
+        best = (None, 0.0, None)
+        for location, entry in candidates.items():
+            score = cosine(query_vector, tfidf_vector(entry["counts"], idf))
+            if score > best[1]:
+                best = (location, score, entry["outputs"])
+        return best
+
+
+def write_tailoring(
+    job_location: str, resume_digest: str, fast: bool, outputs: dict, config_digest: str = None
+):
+    """Store the stage outputs of a tailoring run next to its `job.yaml` for later reuse."""
+    payload = dict(
+        resume_hash=resume_digest,
+        fast=bool(fast),
+        config_digest=config_digest,
+        created=time.time(),
+        outputs=outputs,
+    )
+    with open(os.path.join(job_location, TAILORING_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(payload, f, default=str)
+
+
+job_similarity_index = JobSimilarityIndex()
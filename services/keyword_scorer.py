@@ -0,0 +1,192 @@
+import os
+import sys
+import time
+import argparse
+import functools
+from typing import Dict, List
+import numpy as np
+import config
+import utils
+from services.highlight_ranker import tokenize
+
+MAX_NGRAM = 4
+
+
+@functools.lru_cache(maxsize=65536)
+def _normalize(keyword: str) -> str:
+    """Return the keyword as space-joined tokens, so "Node.js" and "node.js " match."""
+    return " ".join(tokenize(keyword))
+
+
+def _flatten_text(value) -> List[str]:
+    """Collect every string value of a nested resume structure."""
+    if isinstance(value, dict):
+        return [text for item in value.values() for text in _flatten_text(item)]
+    if isinstance(value, (list, tuple)):
+        return [text for item in value for text in _flatten_text(item)]
+    if value is None or isinstance(value, bool):
+        return []
+    return [str(value)]
+
+
+def resume_terms(resume: dict) -> set:
+    """Return every 1 to `MAX_NGRAM` token n-gram of the resume text."""
+    terms = set()
+    for text in _flatten_text(resume):
+        tokens = tokenize(text)
+        for n in range(1, MAX_NGRAM + 1):
+            for start in range(len(tokens) - n + 1):
+                terms.add(" ".join(tokens[start : start + n]))
+    return terms
+
+
+def job_keywords(parsed_job: dict, weights: dict = None) -> Dict[str, float]:
+    """Return the normalized keywords of a parsed job with their weights.
+
+    A keyword listed in several fields keeps the highest weight of those fields.
+    """
+    weights = weights or config.ATS_KEYWORD_WEIGHTS
+    keywords = {}
+    for field, weight in weights.items():
+        values = parsed_job.get(field) or []
+        for value in values if isinstance(values, (list, tuple)) else [values]:
+            keyword = _normalize(str(value))
+            if keyword:
+                keywords[keyword] = max(weight, keywords.get(keyword, 0.0))
+    return keywords
+
+
+def score_jobs(resume: dict, jobs: Dict[str, dict], weights: dict = None) -> List[dict]:
+    """Score how well a resume covers the keywords of many parsed jobs at once.
+
+    The jobs are turned into a sparse job-by-keyword matrix held as NumPy coordinate
+    arrays over a shared vocabulary. The resume becomes a boolean vector over the same
+    vocabulary, and the per-job sums are taken with `np.bincount`. A keyword counts as
+    matched when it appears in the resume as a whole-token phrase.
+
+    Args:
+        resume (dict): The resume, as read from its YAML file.
+        jobs (Dict[str, dict]): Parsed `JobDescription` records keyed by a job name.
+        weights (dict, optional): Weight per job field. Defaults to `config.ATS_KEYWORD_WEIGHTS`.
+
+    Returns:
+        List[dict]: One entry per job, best weighted match first, holding the job name,
+            `coverage` (share of keywords matched), `weighted_match` (share of keyword
+            weight matched), the matched and total keyword counts, and the `missing`
+            keywords, heaviest first.
+    """
+    names = list(jobs)
+    vocabulary = {}
+    job_index, term_index, term_weights = [], [], []
+    for i, name in enumerate(names):
+        for keyword, weight in job_keywords(jobs[name], weights).items():
+            job_index.append(i)
+            term_index.append(vocabulary.setdefault(keyword, len(vocabulary)))
+            term_weights.append(weight)
+    if not names:
+        return []
+    job_index = np.asarray(job_index, dtype=np.int64)
+    term_index = np.asarray(term_index, dtype=np.int64)
+    term_weights = np.asarray(term_weights, dtype=np.float64)
+    terms = np.array(list(vocabulary), dtype=object)
+    present = resume_terms(resume)
+    # Keywords longer than the indexed n-grams fall back to a phrase search.
+    resume_text = " " + " ".join(" ".join(tokenize(t)) for t in _flatten_text(resume)) + " "
+    in_resume = np.fromiter(
+        (
+            term in present
+            if term.count(" ") < MAX_NGRAM
+            else f" {term} " in resume_text
+            for term in terms
+        ),
+        dtype=bool,
+        count=len(terms),
+    )
+    matched = in_resume[term_index]
+    n_jobs = len(names)
+    totals = np.bincount(job_index, minlength=n_jobs)
+    hits = np.bincount(job_index, weights=matched, minlength=n_jobs)
+    weight_totals = np.bincount(job_index, weights=term_weights, minlength=n_jobs)
+    weight_hits = np.bincount(job_index, weights=term_weights * matched, minlength=n_jobs)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coverage = np.where(totals > 0, hits / totals, 0.0)
+        weighted_match = np.where(weight_totals > 0, weight_hits / weight_totals, 0.0)
+    # Group the missing keywords by job, heaviest first within each job.
+    missing = ~matched
+    order = np.lexsort((-term_weights[missing], job_index[missing]))
+    missing_jobs = job_index[missing][order]
+    missing_terms = terms[term_index[missing][order]]
+    boundaries = np.searchsorted(missing_jobs, np.arange(n_jobs + 1))
+    results = [
+        dict(
+            job=name,
+            coverage=float(coverage[i]),
+            weighted_match=float(weighted_match[i]),
+            matched=int(hits[i]),
+            keywords=int(totals[i]),
+            missing=list(missing_terms[boundaries[i] : boundaries[i + 1]]),
+        )
+        for i, name in enumerate(names)
+    ]
+    return sorted(results, key=lambda result: -result["weighted_match"])
+
+
+def load_parsed_jobs(data_path: str = None) -> Dict[str, dict]:
+    """Read every `job.yaml` under `data_path`, keyed by the job folder name.
+
+    Args:
+        data_path (str, optional): Folder holding one subfolder per job. Defaults to `config.DATA_PATH`.
+
+    Returns:
+        Dict[str, dict]: The parsed jobs.
+    """
+    data_path = data_path or config.DATA_PATH
+    jobs = {}
+    if not os.path.isdir(data_path):
+        return jobs
+    for name in sorted(os.listdir(data_path)):
+        job_file = os.path.join(data_path, name, "job.yaml")
+        if not os.path.isfile(job_file):
+            continue
+        try:
+            jobs[name] = utils.read_yaml(filename=job_file) or {}
+        except Exception as e:
+            config.logger.warning(f"Skipping {job_file}: {e}")
+    return jobs
+
+
+def format_scores(results: List[dict], top_missing: int = 5) -> str:
+    """Format the output of `score_jobs` as a ranked table."""
+    lines = [f"{'rank':>4}  {'weighted':>8}  {'coverage':>8}  {'keywords':>8}  job / top missing"]
+    for rank, result in enumerate(results, start=1):
+        lines.append(
+            f"{rank:>4}  {result['weighted_match']:>8.1%}  {result['coverage']:>8.1%}  "
+            f"{result['matched']:>3}/{result['keywords']:<4}  {result['job']}"
+        )
+        if top_missing and result["missing"]:
+            lines.append(f"{'':>40}missing: {', '.join(result['missing'][:top_missing])}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rank stored job postings by how well the resume covers their keywords."
+    )
+    parser.add_argument("--resume", default=config.DEFAULT_RESUME_PATH, help="Path to the resume YAML file")
+    parser.add_argument("--data-path", default=None, help="Folder of job folders (defaults to DATA_PATH)")
+    parser.add_argument("--top", type=int, default=None, help="Only show the best N jobs")
+    parser.add_argument("--min-score", type=float, default=0.0, help="Minimum weighted match (0-1)")
+    parser.add_argument("--missing", type=int, default=5, help="Missing keywords shown per job")
+    args = parser.parse_args(argv)
+    resume = utils.read_yaml(filename=args.resume)
+    jobs = load_parsed_jobs(args.data_path)
+    start = time.perf_counter()
+    results = score_jobs(resume, jobs)
+    elapsed = time.perf_counter() - start
+    results = [r for r in results if r["weighted_match"] >= args.min_score][: args.top]
+    print(format_scores(results, top_missing=args.missing))
+    print(f"Scored {len(jobs)} jobs in {elapsed:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,21 @@ from typing import List
 from dateutil import parser as dateparser
 from dateutil.relativedelta import relativedelta
 from langchain_openai import ChatOpenAI
-import langchain
-from langchain_community.cache import InMemoryCache
+from langchain_core.globals import set_llm_cache
 import config
 import utils
+from services.llm_cache import PersistentLLMCache
 
 # Set up LLM cache
-langchain.llm_cache = InMemoryCache()
+llm_cache = PersistentLLMCache()
+set_llm_cache(llm_cache)
 
 
 def create_llm(**kwargs):
     """Create an LLM instance with specified parameters."""
-    chat_model = kwargs.pop("chat_model", ChatOpenAI)
+    chat_model = kwargs.pop("chat_model", config.CHAT_MODEL)
     kwargs.setdefault("model_name", config.MODEL_NAME)
-    kwargs.setdefault("cache", False)
+    kwargs.setdefault("cache", config.LLM_CACHE_ENABLED)
     return chat_model(**kwargs)
 
 
@@ -41,7 +42,6 @@ def parse_date(date_str: str) -> datetime:
     try:
         return dateparser.parse(str(date_str), default=default_date)
     except dateparser._parser.ParserError as e:
-        langchain.llm_cache.clear()
         config.logger.error(f"Date input `{date_str}` could not be parsed.")
         raise e
 
@@ -178,3 +178,17 @@ def format_projects_for_prompt(input_data) -> list:
             curr += "\n"
             result.append(curr)
     return result
+
+def format_sections_for_batch_prompt(sections: dict) -> str:
+    """Format several resume sections, tagged by id, for a batched highlighter prompt.
+
+    Args:
+        sections (dict): Mapping of section id to section data.
+
+    Returns:
+        str: The sections wrapped in <Section> tags carrying their ids.
+    """
+    return "\n".join(
+        f'<Section id="{section_id}">\n{section}\n</Section>'
+        for section_id, section in sections.items()
+    )
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, Optional
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+import config
+from .sqlite_store import SQLiteLRUStore
+
+
+class PersistentLLMCache(BaseCache):
+    """SQLite-backed LLM response cache with byte-size LRU eviction and optional TTL.
+
+    Entries are keyed by the prompt and the LLM string LangChain passes to the cache.
+    For chat models the LLM string covers the model name, temperature and any bound
+    tools, so the structured output schema is part of the key as well.
+    """
+
+    def __init__(
+        self,
+        database_path: str = None,
+        max_bytes: int = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        """Initialize the cache and create its table if needed.
+
+        Args:
+            database_path (str, optional): Path to the SQLite file. Defaults to `config.LLM_CACHE_PATH`.
+            max_bytes (int, optional): Maximum total size of cached values. Defaults to `config.LLM_CACHE_MAX_BYTES`.
+            ttl_seconds (float, optional): Entries older than this are treated as misses. Defaults to
+                `config.LLM_CACHE_TTL_SECONDS`; None disables expiry.
+        """
+        self.database_path = database_path or config.LLM_CACHE_PATH
+        self.max_bytes = max_bytes or config.LLM_CACHE_MAX_BYTES
+        self.ttl_seconds = (
+            ttl_seconds if ttl_seconds is not None else config.LLM_CACHE_TTL_SECONDS
+        )
+        self._store = SQLiteLRUStore(
+            self.database_path,
+            "llm_cache",
+            """key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL""",
+            self.max_bytes,
+        )
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        """Hash the prompt and LLM string into a fixed-size cache key."""
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up a cached response, refreshing its LRU position on a hit."""
+        row = self._store.get(
+            self._key(prompt, llm_string), "value", max_age=self.ttl_seconds
+        )
+        if row is None:
+            return None
+        try:
+            return loads(row[0])
+        except Exception as e:
+            config.logger.warning(f"Discarding unreadable LLM cache entry: {e}")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store a response and evict least recently used entries above the size limit."""
+        value = dumps(list(return_val))
+        size = len(value.encode("utf-8"))
+        self._store.put(self._key(prompt, llm_string), dict(value=value), size)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Remove every cached response."""
+        self._store.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters together with the current size of the cache."""
+        stats = self._store.stats()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
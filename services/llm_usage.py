@@ -0,0 +1,339 @@
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+from typing import Any, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+import config
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding of `model`, or None if it cannot be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        config.logger.warning(f"Falling back to approximate token counts: {e}")
+        return None
+
+
+def estimate_tokens(text: str, model: str = None) -> int:
+    """Estimate the number of tokens in `text` without calling the API.
+
+    Uses tiktoken when it is installed and its encoding is available, and a
+    four-characters-per-token heuristic otherwise.
+
+    Args:
+        text (str): The text to measure.
+        model (str, optional): The model whose tokenizer to use. Defaults to `config.MODEL_NAME`.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model or config.MODEL_NAME)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, len(text) // 4)
+
+
+def estimate_cost(
+    model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+) -> Optional[float]:
+    """Estimate the USD cost of a call from `config.MODEL_PRICING`.
+
+    Args:
+        model (str): The model name as reported by the API.
+        prompt_tokens (int): Input tokens, including cached ones.
+        completion_tokens (int): Output tokens.
+        cached_tokens (int, optional): Input tokens served from the provider prompt cache.
+
+    Returns:
+        Optional[float]: The estimated cost, or None if the model has no known price.
+    """
+    pricing = None
+    for name in sorted(config.MODEL_PRICING, key=len, reverse=True):
+        if model and model.startswith(name):
+            pricing = config.MODEL_PRICING[name]
+            break
+    if pricing is None:
+        return None
+    uncached = prompt_tokens - cached_tokens
+    cost = (
+        uncached * pricing["input"]
+        + cached_tokens * pricing.get("cached_input", pricing["input"])
+        + completion_tokens * pricing["output"]
+    )
+    return cost / 1_000_000
+
+
+def get_token_usage(response: LLMResult) -> dict:
+    """Extract token counts from an LLM result.
+
+    Reads the standard `usage_metadata` of the returned message, falling back to the
+    provider's `token_usage` block. Results served from the local LLM cache carry no
+    `llm_output` and are reported with `local_cache_hit=True`; their token counts are
+    those of the original call, which `UsageCallbackHandler` does not record.
+
+    Args:
+        response (LLMResult): The result passed to `on_llm_end`.
+
+    Returns:
+        dict: prompt_tokens, completion_tokens, cached_tokens, model and local_cache_hit.
+    """
+    llm_output = response.llm_output or {}
+    usage = dict(
+        prompt_tokens=0,
+        completion_tokens=0,
+        cached_tokens=0,
+        model=llm_output.get("model_name"),
+        local_cache_hit=response.llm_output is None,
+    )
+    message = None
+    if response.generations and response.generations[0]:
+        message = getattr(response.generations[0][0], "message", None)
+    usage_metadata = getattr(message, "usage_metadata", None)
+    if usage_metadata:
+        usage["prompt_tokens"] = usage_metadata.get("input_tokens") or 0
+        usage["completion_tokens"] = usage_metadata.get("output_tokens") or 0
+        input_details = usage_metadata.get("input_token_details") or {}
+        usage["cached_tokens"] = input_details.get("cache_read") or 0
+    elif llm_output.get("token_usage"):
+        token_usage = llm_output["token_usage"]
+        usage["prompt_tokens"] = token_usage.get("prompt_tokens") or 0
+        usage["completion_tokens"] = token_usage.get("completion_tokens") or 0
+        prompt_details = token_usage.get("prompt_tokens_details") or {}
+        usage["cached_tokens"] = prompt_details.get("cached_tokens") or 0
+    return usage
+
+
+def _add_to_totals(totals: dict, key: str, record: dict):
+    """Accumulate one usage record into `totals[key]`."""
+    entry = totals.setdefault(
+        key,
+        dict(
+            calls=0,
+            local_cache_hits=0,
+            prompt_tokens=0,
+            completion_tokens=0,
+            cached_tokens=0,
+            latency_seconds=0.0,
+            cost_usd=0.0,
+        ),
+    )
+    entry["calls"] += 1
+    entry["local_cache_hits"] += int(record["local_cache_hit"])
+    for field in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+        entry[field] += record[field]
+    entry["latency_seconds"] += record["latency_seconds"]
+    entry["cost_usd"] += record["cost_usd"] or 0.0
+
+
+class UsageAggregate:
+    """Process-wide running totals of LLM usage per stage and per model, persisted as JSON.
+
+    Records only update the totals in memory. The file is rewritten at most once every
+    `config.USAGE_AGGREGATE_FLUSH_SECONDS` and at exit, through a temporary file and
+    `os.replace`, so a crash never leaves it truncated.
+    """
+
+    def __init__(self, path: str = None, flush_seconds: float = None):
+        """Initialize the aggregate, loading previous totals from `path` if present.
+
+        Args:
+            path (str, optional): JSON file holding the totals. Defaults to `config.USAGE_AGGREGATE_PATH`.
+            flush_seconds (float, optional): Minimum time between writes of the file.
+                Defaults to `config.USAGE_AGGREGATE_FLUSH_SECONDS`.
+        """
+        self.path = path or config.USAGE_AGGREGATE_PATH
+        self.flush_seconds = (
+            flush_seconds if flush_seconds is not None else config.USAGE_AGGREGATE_FLUSH_SECONDS
+        )
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.totals = dict(stages={}, models={})
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r") as file:
+                    self.totals = json.load(file)
+            except (OSError, ValueError) as e:
+                config.logger.warning(f"Could not read usage aggregate {self.path}: {e}")
+        atexit.register(self.flush)
+
+    def record(self, record: dict):
+        """Add one usage record to the totals, persisting them if the flush interval passed."""
+        with self._lock:
+            _add_to_totals(self.totals["stages"], record["stage"], record)
+            _add_to_totals(self.totals["models"], record["model"] or "unknown", record)
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the totals to `path` if they changed since the last write."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                serialized = json.dumps(self.totals, indent=2)
+                self._dirty = False
+                self._last_flush = time.monotonic()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp_path, "w") as file:
+                    file.write(serialized)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                config.logger.warning(f"Could not write usage aggregate {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
+
+    def summary(self) -> dict:
+        """Return a copy of the running totals."""
+        with self._lock:
+            return json.loads(json.dumps(self.totals))
+
+
+usage_aggregate = UsageAggregate()
+
+
+class UsageLog:
+    """Usage records of the LLM calls made for one job.
+
+    Records are buffered until `bind` is given the job data folder, because the job
+    parse runs before that folder is known. After that every record is written to
+    `usage.json` in the folder immediately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records = []
+        self.path = None
+
+    def bind(self, job_data_location: str):
+        """Attach the log to a job data folder and write the buffered records there."""
+        with self._lock:
+            self.path = os.path.join(job_data_location, "usage.json")
+            self._write()
+
+    def callback(self, stage: str) -> "UsageCallbackHandler":
+        """Return a callback handler that records calls under `stage`."""
+        return UsageCallbackHandler(self, stage)
+
+    def record(self, record: dict):
+        """Store one usage record and add it to the process-wide aggregate."""
+        with self._lock:
+            self.records.append(record)
+            self._write()
+        usage_aggregate.record(record)
+
+    def _write(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "w") as file:
+                json.dump(
+                    dict(records=self.records, summary=self._summarize()), file, indent=2
+                )
+        except OSError as e:
+            config.logger.warning(f"Could not write usage log {self.path}: {e}")
+
+    def _summarize(self) -> dict:
+        totals = {}
+        for record in self.records:
+            _add_to_totals(totals, record["stage"], record)
+        return totals
+
+    def summary(self) -> dict:
+        """Return usage totals per stage for this job."""
+        with self._lock:
+            return self._summarize()
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Callback handler that measures each chat model call of one stage.
+
+    Before the call it estimates the prompt tokens locally; after it records the
+    token counts the API reported, the latency, the model and the estimated cost.
+    """
+
+    def __init__(self, usage_log: UsageLog, stage: str):
+        self.usage_log = usage_log
+        self.stage = stage
+        self._runs = {}
+
+    def on_chat_model_start(
+        self, serialized: dict, messages: list, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model")
+        text = "\n".join(
+            str(message.content) for batch in messages for message in batch
+        )
+        self._runs[run_id] = dict(
+            start=time.perf_counter(),
+            model=model,
+            estimated_prompt_tokens=estimate_tokens(text, model),
+        )
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        # Streamed results carry no `llm_output` either, but they are not cache hits.
+        if run_id in self._runs:
+            self._runs[run_id]["streamed"] = True
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        run = self._runs.pop(run_id, None) or dict(
+            start=time.perf_counter(), model=None, estimated_prompt_tokens=None
+        )
+        usage = get_token_usage(response)
+        if run.get("streamed"):
+            usage["local_cache_hit"] = False
+        model = usage["model"] or run["model"]
+        cost = 0.0
+        if usage["local_cache_hit"]:
+            # The cached message still carries the usage of the call that filled the
+            # cache; nothing was sent now, so only the hit is counted.
+            usage.update(prompt_tokens=0, completion_tokens=0, cached_tokens=0)
+        else:
+            cost = estimate_cost(
+                model,
+                usage["prompt_tokens"],
+                usage["completion_tokens"],
+                usage["cached_tokens"],
+            )
+        self.usage_log.record(
+            dict(
+                stage=self.stage,
+                model=model,
+                timestamp=time.time(),
+                latency_seconds=time.perf_counter() - run["start"],
+                estimated_prompt_tokens=run["estimated_prompt_tokens"],
+                prompt_tokens=usage["prompt_tokens"],
+                completion_tokens=usage["completion_tokens"],
+                cached_tokens=usage["cached_tokens"],
+                local_cache_hit=usage["local_cache_hit"],
+                cost_usd=cost,
+            )
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._runs.pop(run_id, None)
@@ -0,0 +1,171 @@
+import threading
+import config
+from services.chain_registry import chain_registry
+
+ROUTE_SUFFIXES = ("_FAST",)
+
+
+def route_stage(prompt_type: str) -> str:
+    """Return the routing stage of a prompt type, shared by its fast variant."""
+    for suffix in ROUTE_SUFFIXES:
+        if prompt_type.endswith(suffix):
+            return prompt_type[: -len(suffix)]
+    return prompt_type
+
+
+def _highlight_problems(highlights, prefix: str = "") -> list[str]:
+    if not highlights:
+        return [f"{prefix}empty final_answer"]
+    problems = []
+    for highlight in highlights:
+        if not str(highlight.get("highlight") or "").strip():
+            problems.append(f"{prefix}empty highlight")
+        relevance = highlight.get("relevance")
+        if not isinstance(relevance, int) or not 1 <= relevance <= 5:
+            problems.append(f"{prefix}relevance {relevance!r} out of range 1-5")
+    return problems
+
+
+def validate_output(stage: str, output: dict) -> list[str]:
+    """Check a structured LLM output for problems the schema does not catch.
+
+    Args:
+        stage (str): The routing stage (prompt type without the fast suffix, or "JOB_PARSER").
+        output (dict): The structured output as a dict.
+
+    Returns:
+        list[str]: Descriptions of the problems found; empty if the output looks usable.
+    """
+    if not output:
+        return ["empty output"]
+    if stage == "JOB_PARSER":
+        # Partial parses only ask for the fields the page's structured data lacked.
+        return [
+            f"missing {field}"
+            for field in ("company", "job_title")
+            if field in output and not str(output.get(field) or "").strip()
+        ]
+    if stage == "SECTION_BATCH_HIGHLIGHTER":
+        if not output.get("sections"):
+            return ["no sections"]
+        problems = []
+        for section in output["sections"]:
+            problems.extend(
+                _highlight_problems(
+                    section.get("final_answer"), f"{section.get('section_id')}: "
+                )
+            )
+        return problems
+    final_answer = output.get("final_answer")
+    if stage == "SECTION_HIGHLIGHTER":
+        return _highlight_problems(final_answer)
+    if stage == "SKILLS_MATCHER":
+        if not final_answer or not (
+            final_answer.get("technical_skills") or final_answer.get("non_technical_skills")
+        ):
+            return ["no skills in final_answer"]
+        return []
+    if not final_answer or (isinstance(final_answer, str) and not final_answer.strip()):
+        return ["empty final_answer"]
+    return []
+
+
+class ModelRouter:
+    """Choose the model of each stage and count escalations to the large model.
+
+    Stages listed in `config.MODEL_ROUTES` start on their routed (usually smaller)
+    model; a call whose output fails `validate_output` is retried on
+    `config.ESCALATION_MODEL_NAME`. Counters per stage let the routes be tuned.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def route(self, stage: str) -> str:
+        """Return the model name a call of `stage` should start on."""
+        return config.MODEL_ROUTES.get(route_stage(stage), config.MODEL_NAME)
+
+    def escalation_model(self, model_name: str) -> str:
+        """Return the model to retry on, or None if `model_name` is already the largest."""
+        if model_name == config.ESCALATION_MODEL_NAME:
+            return None
+        return config.ESCALATION_MODEL_NAME
+
+    def record(self, stage: str, model_name: str, escalated: bool):
+        """Count one routed call of `stage` and whether it had to be escalated."""
+        with self._lock:
+            entry = self.stats.setdefault(
+                route_stage(stage), dict(calls=0, escalations=0, models={})
+            )
+            entry["calls"] += 1
+            entry["escalations"] += int(escalated)
+            entry["models"][model_name] = entry["models"].get(model_name, 0) + 1
+
+    def summary(self) -> dict:
+        """Return the per-stage counters with their escalation rates."""
+        with self._lock:
+            return {
+                stage: dict(
+                    entry,
+                    models=dict(entry["models"]),
+                    escalation_rate=entry["escalations"] / entry["calls"],
+                )
+                for stage, entry in self.stats.items()
+            }
+
+    def invoke(self, chain, chain_inputs, stage: str = None, callbacks: list = None, logger=None):
+        """Invoke a routed chain, retrying on the escalation model if its output fails validation.
+
+        Args:
+            chain (CompiledChain): The chain built for the routed model of the stage.
+            chain_inputs: The chain input.
+            stage (str, optional): The routing stage. Defaults to the prompt type of the chain.
+            callbacks (list, optional): Callbacks for every attempt, such as usage recording.
+            logger (logging.Logger, optional): Defaults to `config.logger`.
+
+        Returns:
+            The structured output of the last attempt.
+        """
+        logger = logger or config.logger
+        stage = route_stage(stage or chain.prompt_type)
+        model_name = chain.llm_kwargs["model_name"]
+        escalation_model = self.escalation_model(model_name)
+        run_config = {"callbacks": callbacks or []}
+        logger.debug(f"Routing {stage} to {model_name}")
+        if escalation_model is None:
+            output = chain.invoke(chain_inputs, config=run_config)
+            self.record(stage, model_name, escalated=False)
+            return output
+        try:
+            output = chain.invoke(chain_inputs, config=run_config)
+            problems = validate_output(stage, output.dict() if output is not None else None)
+        except ValueError as e:
+            # Schema validation and output parsing errors are worth a retry on the larger model.
+            problems = [f"invalid output: {e}"]
+        self.record(stage, model_name, escalated=bool(problems))
+        if not problems:
+            return output
+        logger.warning(
+            f"Escalating {stage} from {model_name} to {escalation_model}: "
+            + "; ".join(problems[:3])
+        )
+        escalated_chain = chain_registry.get(
+            chain.prompt_type,
+            chain.pydantic_object,
+            dict(chain.llm_kwargs, model_name=escalation_model),
+        )
+        return escalated_chain.invoke(chain_inputs, config=run_config)
+
+    def log_summary(self, logger=None):
+        """Log the routed models and escalation rate of every stage."""
+        logger = logger or config.logger
+        for stage, entry in self.summary().items():
+            models = ", ".join(f"{name} x{count}" for name, count in entry["models"].items())
+            logger.info(
+                f"Routing {stage}: {entry['calls']} calls started on {models}; "
+                f"{entry['escalations']} escalated ({entry['escalation_rate']:.0%})"
+            )
+
+
+model_router = ModelRouter()
@@ -0,0 +1,172 @@
+import json
+import time
+import zlib
+import hashlib
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import config
+from .sqlite_store import SQLiteLRUStore
+
+# Query parameters that only track the click; matched by exact (lower-cased) name
+TRACKING_PARAMS = frozenset(
+    {"gclid", "fbclid", "msclkid", "dclid", "mc_cid", "mc_eid", "ref", "source", "trk"}
+)
+# Query parameter prefixes that only track the click
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(key: str) -> bool:
+    key = key.lower()
+    return key in TRACKING_PARAMS or key.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a job URL so that trivially different links share one cache entry.
+
+    Lower-cases the scheme and host, drops default ports, fragments, trailing slashes
+    and tracking query parameters, and sorts the remaining query parameters. Tracking
+    parameters are matched by exact name, so keys such as `referenceId` or `sourceId`
+    that identify the posting are kept.
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(key)
+    )
+    return urlunsplit((scheme, host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    """Return the SHA-256 hex digest of a page or its extracted text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class JobPageCache:
+    """SQLite cache of downloaded job pages and their parsed job descriptions.
+
+    Entries are keyed by `normalize_url` and hold the zlib-compressed HTML, the ETag and
+    Last-Modified validators for conditional requests, hashes of the HTML and of the
+    extracted job text, the extracted text and report, and the parsed job. Least
+    recently used entries are evicted once the stored size exceeds the quota.
+    """
+
+    def __init__(self, database_path: str = None, max_bytes: int = None):
+        """Initialize the cache and create its table if needed.
+
+        Args:
+            database_path (str, optional): Path to the SQLite file. Defaults to `config.PAGE_CACHE_PATH`.
+            max_bytes (int, optional): Maximum total size of the entries. Defaults to `config.PAGE_CACHE_MAX_BYTES`.
+        """
+        self.database_path = database_path or config.PAGE_CACHE_PATH
+        self.max_bytes = max_bytes or config.PAGE_CACHE_MAX_BYTES
+        self._store = SQLiteLRUStore(
+            self.database_path,
+            "job_pages",
+            """key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            html BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            html_hash TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            job_text TEXT NOT NULL,
+            extraction_report TEXT,
+            parsed_job TEXT,
+            size INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL""",
+            self.max_bytes,
+        )
+
+    def get(self, url: str) -> Optional[dict]:
+        """Return the cached entry of `url`, or None on a miss.
+
+        Returns:
+            dict: `url`, `html`, `etag`, `last_modified`, `html_hash`, `text_hash`,
+                `job_text`, `extraction_report`, `parsed_job` and `fetched_at`.
+        """
+        row = self._store.get(
+            normalize_url(url),
+            """url, html, etag, last_modified, html_hash, text_hash, job_text,
+            extraction_report, parsed_job, fetched_at""",
+        )
+        if row is None:
+            return None
+        try:
+            return dict(
+                url=row[0],
+                html=zlib.decompress(row[1]).decode("utf-8"),
+                etag=row[2],
+                last_modified=row[3],
+                html_hash=row[4],
+                text_hash=row[5],
+                job_text=row[6],
+                extraction_report=json.loads(row[7]) if row[7] else None,
+                parsed_job=json.loads(row[8]) if row[8] else None,
+                fetched_at=row[9],
+            )
+        except (zlib.error, ValueError) as e:
+            config.logger.warning(f"Discarding unreadable page cache entry for {url}: {e}")
+            return None
+
+    def set(
+        self,
+        url: str,
+        html: str,
+        job_text: str,
+        parsed_job: dict = None,
+        extraction_report: dict = None,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        """Store a page with its extraction and parse, then evict down to the size quota."""
+        compressed = zlib.compress(html.encode("utf-8"), level=6)
+        extraction_report = json.dumps(extraction_report) if extraction_report else None
+        parsed_job = json.dumps(parsed_job, default=str) if parsed_job else None
+        size = (
+            len(compressed)
+            + len(job_text.encode("utf-8"))
+            + len(extraction_report or "")
+            + len(parsed_job or "")
+        )
+        self._store.put(
+            normalize_url(url),
+            dict(
+                url=url,
+                html=compressed,
+                etag=etag,
+                last_modified=last_modified,
+                html_hash=content_hash(html),
+                text_hash=content_hash(job_text),
+                job_text=job_text,
+                extraction_report=extraction_report,
+                parsed_job=parsed_job,
+                fetched_at=time.time(),
+            ),
+            size,
+        )
+
+    def touch(self, url: str):
+        """Mark a cached page as revalidated now, after a 304 answer."""
+        self._store.execute(
+            "UPDATE job_pages SET fetched_at = ? WHERE key = ?",
+            (time.time(), normalize_url(url)),
+        )
+
+    def clear(self):
+        """Remove every cached page."""
+        self._store.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters together with the current size of the cache."""
+        return self._store.stats()
+
+
+job_page_cache = JobPageCache()
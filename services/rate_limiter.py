@@ -0,0 +1,333 @@
+import time
+import random
+import threading
+import contextvars
+from email.utils import parsedate_to_datetime
+from typing import Any, Iterator, Optional
+from langchain_core.prompt_values import PromptValue
+from langchain_core.rate_limiters import BaseRateLimiter
+from langchain_core.runnables import Runnable, RunnableConfig
+from openai import RateLimitError
+import config
+from services.llm_usage import estimate_tokens
+
+MIN_RATE_SCALE = 0.25
+RATE_SCALE_DECREASE = 0.75
+RATE_SCALE_INCREASE = 0.05
+
+# Tokens of the call in progress in this context, set by `RateLimitedRunnable` and
+# reserved by `ModelRateLimiter` once the model has missed its response cache.
+_pending_tokens = contextvars.ContextVar("pending_llm_tokens", default=None)
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations in arrival order.
+
+    The level may go negative: a caller that takes more than is available is told how
+    long to wait until the debt is refilled, and later callers queue behind it.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float):
+        """Initialize a full bucket.
+
+        Args:
+            per_minute (float): Sustained refill rate per minute.
+            burst_seconds (float): Seconds of refill the bucket can hold for bursts.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, scale: float = 1.0) -> float:
+        """Take `amount` from the bucket and return the seconds to wait before using it.
+
+        Args:
+            amount (float): The amount to take. Capped at the capacity so that one large
+                request cannot block forever.
+            scale (float, optional): Multiplier applied to the refill rate. Defaults to 1.0.
+
+        Returns:
+            float: The wait in seconds, 0 if the amount was available.
+        """
+        now = time.monotonic()
+        rate = self.rate * scale
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / rate)
+
+
+class RateLimiter:
+    """Process-wide client-side limiter for requests and tokens per minute.
+
+    Every LLM call reserves one request and its estimated tokens (prompt plus the
+    expected completion) before it is sent. When the provider still answers with a
+    rate limit error, all callers pause for the Retry-After period and the refill rate
+    is lowered, then recovers gradually as calls succeed.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        headroom: float = None,
+        burst_seconds: float = None,
+    ):
+        """Initialize the RateLimiter.
+
+        Args:
+            requests_per_minute (float, optional): Defaults to `config.LLM_REQUESTS_PER_MINUTE`.
+            tokens_per_minute (float, optional): Defaults to `config.LLM_TOKENS_PER_MINUTE`.
+            headroom (float, optional): Fraction of the limits to target. Defaults to `config.RATE_LIMIT_HEADROOM`.
+            burst_seconds (float, optional): Defaults to `config.RATE_LIMIT_BURST_SECONDS`.
+        """
+        requests_per_minute = requests_per_minute or config.LLM_REQUESTS_PER_MINUTE
+        tokens_per_minute = tokens_per_minute or config.LLM_TOKENS_PER_MINUTE
+        headroom = headroom or config.RATE_LIMIT_HEADROOM
+        burst_seconds = burst_seconds or config.RATE_LIMIT_BURST_SECONDS
+        self.request_bucket = None
+        self.token_bucket = None
+        if requests_per_minute:
+            self.request_bucket = TokenBucket(requests_per_minute * headroom, burst_seconds)
+        if tokens_per_minute:
+            self.token_bucket = TokenBucket(tokens_per_minute * headroom, burst_seconds)
+        self.rate_scale = 1.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._metrics = dict(
+            requests=0,
+            queue_depth=0,
+            max_queue_depth=0,
+            throttled=0,
+            wait_seconds=0.0,
+            rate_limit_errors=0,
+        )
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request carrying `tokens` tokens may be sent.
+
+        Args:
+            tokens (int, optional): Estimated tokens the request counts against the limit.
+
+        Returns:
+            float: The seconds spent waiting.
+        """
+        with self._lock:
+            wait = 0.0
+            if self.request_bucket is not None:
+                wait = self.request_bucket.reserve(1, self.rate_scale)
+            if self.token_bucket is not None:
+                wait = max(wait, self.token_bucket.reserve(tokens, self.rate_scale))
+            self._metrics["requests"] += 1
+            if wait > 0:
+                self._metrics["throttled"] += 1
+            self._metrics["queue_depth"] += 1
+            self._metrics["max_queue_depth"] = max(
+                self._metrics["max_queue_depth"], self._metrics["queue_depth"]
+            )
+        start = time.monotonic()
+        try:
+            if wait > 0:
+                time.sleep(wait)
+            # A rate limit error seen while we waited pauses every caller.
+            while True:
+                with self._lock:
+                    remaining = self._paused_until - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(remaining)
+        finally:
+            waited = time.monotonic() - start
+            with self._lock:
+                self._metrics["queue_depth"] -= 1
+                self._metrics["wait_seconds"] += waited
+        return waited
+
+    def on_success(self):
+        """Let the refill rate recover after a successful call."""
+        with self._lock:
+            self.rate_scale = min(1.0, self.rate_scale + RATE_SCALE_INCREASE)
+
+    def on_rate_limited(self, retry_after: float):
+        """Pause every caller for `retry_after` seconds and lower the refill rate."""
+        with self._lock:
+            self._metrics["rate_limit_errors"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.rate_scale = max(MIN_RATE_SCALE, self.rate_scale * RATE_SCALE_DECREASE)
+
+    def metrics(self) -> dict:
+        """Return counters of requests, throttling, queue depth and rate limit errors."""
+        with self._lock:
+            return dict(self._metrics, rate_scale=round(self.rate_scale, 3))
+
+    def wrap(
+        self,
+        runnable: Runnable,
+        expected_completion_tokens: int = None,
+        reserve_in_model: bool = False,
+    ) -> "RateLimitedRunnable":
+        """Return `runnable` wrapped so that each call goes through this limiter.
+
+        Args:
+            runnable (Runnable): The model step.
+            expected_completion_tokens (int, optional): Defaults to `config.LLM_EXPECTED_COMPLETION_TOKENS`.
+            reserve_in_model (bool, optional): The model carries `model_limiter()` as its
+                `rate_limiter`, so it reserves only after missing the LLM response cache.
+                Defaults to False, which reserves before every call.
+        """
+        return RateLimitedRunnable(
+            runnable,
+            self,
+            expected_completion_tokens=expected_completion_tokens,
+            reserve_in_model=reserve_in_model,
+        )
+
+    def model_limiter(self) -> "ModelRateLimiter":
+        """Return the adapter to pass as a chat model's `rate_limiter`."""
+        return ModelRateLimiter(self)
+
+
+class ModelRateLimiter(BaseRateLimiter):
+    """LangChain rate limiter adapter that reserves on a `RateLimiter`.
+
+    Chat models call their `rate_limiter` after the response cache lookup, so cache
+    hits reserve nothing. The tokens reserved are those `RateLimitedRunnable` estimated
+    for the call in progress.
+    """
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        tokens = _pending_tokens.get()
+        if tokens is None:
+            tokens = config.LLM_EXPECTED_COMPLETION_TOKENS
+        self.limiter.acquire(tokens)
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        return self.acquire(blocking=blocking)
+
+
+def _input_text(value) -> str:
+    """Return the text of a model input for token estimation."""
+    if isinstance(value, PromptValue):
+        return value.to_string()
+    if isinstance(value, list):
+        return "\n".join(str(getattr(m, "content", m)) for m in value)
+    return str(value)
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """Read the Retry-After delay in seconds from the HTTP response of `error`, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class RateLimitedRunnable(Runnable):
+    """Runnable that sends each call of the wrapped model step through a `RateLimiter`.
+
+    Wrap the model step only (for example `prompt | limiter.wrap(structured_llm)`) so the
+    token estimate sees the formatted prompt and the chain keeps its input schema.
+    Rate limit errors are retried up to `config.LLM_MAX_RETRIES` times; quota errors
+    are not, since waiting does not fix them. With `reserve_in_model`, the reservation
+    itself is left to the model's `ModelRateLimiter`, so response cache hits skip it.
+    """
+
+    def __init__(
+        self,
+        bound: Runnable,
+        limiter: RateLimiter,
+        expected_completion_tokens: int = None,
+        reserve_in_model: bool = False,
+    ):
+        self.bound = bound
+        self.limiter = limiter
+        self.expected_completion_tokens = (
+            expected_completion_tokens or config.LLM_EXPECTED_COMPLETION_TOKENS
+        )
+        self.reserve_in_model = reserve_in_model
+
+    @property
+    def InputType(self) -> Any:
+        return self.bound.InputType
+
+    @property
+    def OutputType(self) -> Any:
+        return self.bound.OutputType
+
+    def _acquire(self, input) -> None:
+        tokens = estimate_tokens(_input_text(input)) + self.expected_completion_tokens
+        if self.reserve_in_model:
+            _pending_tokens.set(tokens)
+        else:
+            self.limiter.acquire(tokens)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Decide whether to retry after `error`, pausing the limiter if so."""
+        if not isinstance(error, RateLimitError) or attempt >= config.LLM_MAX_RETRIES:
+            return False
+        if getattr(error, "code", None) == "insufficient_quota":
+            return False
+        retry_after = get_retry_after(error)
+        if retry_after is None:
+            retry_after = config.LLM_RETRY_BASE_SECONDS * 2**attempt
+            retry_after += random.uniform(0, retry_after / 2)
+        config.logger.warning(
+            f"LLM rate limit hit, retrying in {retry_after:.1f}s "
+            f"(attempt {attempt + 1} of {config.LLM_MAX_RETRIES})"
+        )
+        self.limiter.on_rate_limited(retry_after)
+        return True
+
+    def invoke(self, input, config: Optional[RunnableConfig] = None, **kwargs: Any):
+        attempt = 0
+        while True:
+            self._acquire(input)
+            try:
+                output = self.bound.invoke(input, config, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self.limiter.on_success()
+            return output
+
+    def stream(
+        self, input, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> Iterator:
+        attempt = 0
+        while True:
+            self._acquire(input)
+            started = False
+            try:
+                for chunk in self.bound.stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # Chunks already handed out cannot be taken back, so only retry before the first.
+                if started or not self._should_retry(e, attempt):
+                    raise
+                attempt += 1
+                continue
+            self.limiter.on_success()
+            return
+
+
+rate_limiter = RateLimiter()
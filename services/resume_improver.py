@@ -2,10 +2,8 @@ import os
 import time
 import subprocess
 from datetime import datetime
-import streamlit as st
 from typing import List, Optional
 
-import streamlit
 from bs4 import BeautifulSoup
 import uuid
 import requests
@@ -17,6 +15,8 @@ from models.resume import (
     ResumeSkillsMatcherOutput,
     ResumeSummarizerOutput,
     ResumeSectionHighlighterOutput,
+    ResumeSectionBatchHighlighterOutput,
+    FAST_OUTPUT_SCHEMAS,
 )
 import utils
 import config
@@ -24,26 +24,76 @@ from services.langchain_helpers import *
 from prompts import Prompts
 from models.job_post import JobPost
 from pdf_generation import ResumePDFGenerator
+import json
 import concurrent.futures
+import threading
 from fp.fp import FreeProxy
 import time
 from config import config
 from services.background_runner import BackgroundRunner
+from services.stage_scheduler import StageScheduler
+from services.section_memo import message_template, section_memo, section_memo_key
+from services.llm_usage import UsageLog
+from services.rate_limiter import rate_limiter
+from services.chain_registry import CompiledChain, chain_registry
+from services.model_router import model_router
+from services.job_similarity import (
+    TAILORING_FILENAME,
+    job_similarity_index,
+    resume_hash,
+    tailoring_digest,
+    write_tailoring,
+)
+from services.highlight_ranker import HighlightRanker
+from services.job_fetcher import get_session, iter_fetched
+from services.page_cache import content_hash, job_page_cache
+from services.job_fingerprint import job_fingerprint_index, job_header
+
+# Prompt types whose outputs are stored in `tailoring.json` and reused for similar jobs
+TAILORING_PROMPT_TYPES = (
+    "SKILLS_MATCHER",
+    "OBJECTIVE_WRITER",
+    "SECTION_HIGHLIGHTER",
+    "SECTION_BATCH_HIGHLIGHTER",
+)
 
 
 class ResumeImprover:
 
-    def __init__(self, url, resume_location=None, llm_kwargs: dict = None):
+    def __init__(
+        self,
+        url,
+        resume_location=None,
+        llm_kwargs: dict = None,
+        html: str = None,
+        lazy: bool = False,
+        reuse_duplicates: bool = None,
+    ):
         """Initialize ResumeImprover with the job post URL and optional resume location.
 
         Args:
             url (str): The URL of the job post.
             resume_location (str, optional): The file path to the resume. Defaults to None.
             llm_kwargs (dict, optional): Additional keyword arguments for the language model. Defaults to None.
+            html (str, optional): The already fetched job post page. Defaults to downloading `url`.
+            lazy (bool, optional): Skip downloading and parsing the job post, so the caller can
+                run `download_and_parse_job_post` later, e.g. in a worker thread. Defaults to False.
+            reuse_duplicates (bool, optional): Reuse the folder of a stored near-duplicate
+                posting instead of parsing the job. Defaults to `config.NEAR_DUPLICATE_ENABLED`.
         """
         super().__init__()
         self.job_post_html_data = None
         self.job_post_raw = None
+        self.extraction_report = None
+        self.structured_fields = {}
+        self.structured_extras = {}
+        self.structured_description = ""
+        self.page_not_modified = False
+        self.page_validators = {}
+        self.duplicate_of = None
+        self.reuse_duplicates = (
+            config.NEAR_DUPLICATE_ENABLED if reuse_duplicates is None else reuse_duplicates
+        )
         self.resume = None
         self.resume_yaml = None
         self.job_post = None
@@ -52,9 +102,17 @@ class ResumeImprover:
         self.editing = False
         self.clean_url = None
         self.job_data_location = None
+        self.reused_from = None
         self.yaml_loc = None
+        self.stage_timings = {}
+        self.section_stats = {}
+        self._stats_lock = threading.Lock()
+        # Caps the LLM calls in flight across every stage and section worker of this job.
+        self._llm_slots = threading.BoundedSemaphore(config.MAX_CONCURRENT_WORKERS)
+        self.usage_log = UsageLog()
         self.url = url
-        self.download_and_parse_job_post()
+        if not lazy:
+            self.download_and_parse_job_post(html=html)
         self.resume_location = resume_location or config.DEFAULT_RESUME_PATH
         self._update_resume_fields()
 
@@ -82,29 +140,68 @@ class ResumeImprover:
         self._update_resume_fields()
 
     def _extract_html_data(self):
-        """Extract text content from HTML, removing all HTML tags.
+        """Extract the job posting text from HTML, removing page boilerplate and all HTML tags.
+
+        A schema.org JobPosting embedded in the page as JSON-LD or microdata is read into
+        `structured_fields`, `structured_extras` and `structured_description`, so the LLM
+        parse only has to fill in the remaining fields.
 
         Raises:
             Exception: If HTML data extraction fails.
         """
         try:
-            soup = BeautifulSoup(self.job_post_html_data, "html.parser")
-            self.job_post_raw = soup.get_text(separator=" ", strip=True)
+            self.job_post_raw, self.extraction_report = utils.extract_main_text(
+                self.job_post_html_data
+            )
+            config.logger.info(
+                f"Extracted job text with {self.extraction_report['method']} "
+                f"(confidence {self.extraction_report['confidence']}): "
+                f"kept {self.extraction_report['extracted_chars']} of "
+                f"{self.extraction_report['original_chars']} characters, "
+                f"removed {self.extraction_report['removed_ratio']:.0%}"
+            )
+            self.structured_fields, self.structured_extras = {}, {}
+            self.structured_description = ""
+            if config.STRUCTURED_DATA_ENABLED:
+                fields, extras, description, source = utils.extract_job_posting(
+                    self.job_post_html_data
+                )
+                if source is not None:
+                    self.structured_fields, self.structured_extras = fields, extras
+                    self.structured_description = description
+                    self.extraction_report["structured_data"] = dict(
+                        source=source, fields=sorted(fields), extra_fields=sorted(extras)
+                    )
+                    config.logger.info(
+                        f"Found a schema.org JobPosting ({source}) with fields: "
+                        f"{', '.join(sorted(fields)) or 'none usable'}"
+                    )
         except Exception as e:
             config.logger.error(f"Failed to extract HTML data: {e}")
             raise
 
-    def _download_url(self, url=None):
+    def _download_url(self, url=None, cached: dict = None):
         """Download the content of the URL and return it as a string.
 
         Args:
             url (str, optional): The URL to download. Defaults to None.
+            cached (dict, optional): The page cache entry of the URL. Its ETag and
+                Last-Modified validators make the request conditional, and a 304 answer
+                reuses its HTML and sets `page_not_modified`.
 
         Returns:
             bool: True if download was successful, False otherwise.
         """
         if url:
             self.url = url
+        self.page_not_modified = False
+        self.page_validators = {}
+        conditional_headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                conditional_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                conditional_headers["If-Modified-Since"] = cached["last_modified"]
 
         max_retries = config.MAX_RETRIES
         backoff_factor = config.BACKOFF_FACTOR
@@ -117,15 +214,27 @@ class ResumeImprover:
                     proxy = FreeProxy(rand=True).get()
                     proxies = {"http": proxy, "https": proxy}
 
-                response = requests.get(
-                    self.url, headers=config.REQUESTS_HEADERS, proxies=proxies
+                response = get_session().get(
+                    self.url,
+                    headers=conditional_headers,
+                    proxies=proxies,
+                    timeout=config.FETCH_TIMEOUT_SECONDS,
                 )
                 response.raise_for_status()
+                if response.status_code == 304 and cached is not None:
+                    self.page_not_modified = True
+                    self.job_post_html_data = cached["html"]
+                    return True
+                self.page_validators = dict(
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
                 self.job_post_html_data = response.text
                 return True
 
             except requests.RequestException as e:
-                if response.status_code == 429:
+                status_code = getattr(e.response, "status_code", None)
+                if status_code == 429:
                     config.logger.warning(
                         f"Rate limit exceeded. Retrying in {backoff_factor * 2 ** attempt} seconds..."
                     )
@@ -138,37 +247,185 @@ class ResumeImprover:
         config.logger.error(f"Exceeded maximum retries for URL {self.url}")
         return False
 
-    def download_and_parse_job_post(self, url=None):
+    def download_and_parse_job_post(self, url=None, html: str = None):
         """Download and parse the job post from the provided URL.
 
         Args:
             url (str, optional): The URL of the job post. Defaults to None.
+            html (str, optional): The already fetched page, which skips the download.
         """
         if url:
             self.url = url
-        self._download_url()
-        self._extract_html_data()
-        self.job_post = JobPost(self.job_post_raw)
-        self.parsed_job = self.job_post.parse_job_post(verbose=False)
-        try:
-            filename = self.parsed_job["company"] + "_" + self.parsed_job["job_title"]
-            filename = filename.replace(" ", "_")
-        except KeyError:
-            if "://" in self.url:
-                filename = self.url.split("://")[1]
-            else:
-                filename = self.url
-            url_paths = filename.split("/")
-            filename = url_paths[0]
-            if len(url_paths) > 1:
-                filename = filename + "." + url_paths[-1]
-        self.clean_url = filename
-        filepath = os.path.join(config.DATA_PATH, self.clean_url)
+        cached = job_page_cache.get(self.url) if config.PAGE_CACHE_ENABLED else None
+        self.page_not_modified = False
+        self.page_validators = {}
+        self.duplicate_of = None
+        if html is None:
+            self._download_url(cached=cached)
+        else:
+            self.job_post_html_data = html
+        self._extract_and_parse_job_post(cached)
+        if self.duplicate_of is not None:
+            # Link the new URL to the folder of the posting it duplicates.
+            filepath = self.duplicate_of["job_location"]
+            self.clean_url = os.path.basename(filepath)
+        else:
+            self.clean_url = self._job_folder_name()
+            filepath = os.path.join(config.DATA_PATH, self.clean_url)
         self.job_data_location = filepath
         os.makedirs(self.job_data_location, exist_ok=True)
+        self.usage_log.bind(self.job_data_location)
         utils.write_yaml(
             self.parsed_job, filename=os.path.join(self.job_data_location, "job.yaml")
         )
+        if config.NEAR_DUPLICATE_ENABLED and self.job_post_raw:
+            job_fingerprint_index.add(self.url, self.job_post_raw, self.job_data_location)
+
+    def _job_folder_name(self) -> str:
+        """Name the job's data folder after its company and title, or its URL if both are missing."""
+        company = self.parsed_job.get("company")
+        job_title = self.parsed_job.get("job_title")
+        if company or job_title:
+            filename = (company or "Unknown") + "_" + (job_title or "Unknown")
+            return filename.replace(" ", "_")
+        if "://" in self.url:
+            filename = self.url.split("://")[1]
+        else:
+            filename = self.url
+        url_paths = filename.split("/")
+        filename = url_paths[0]
+        if len(url_paths) > 1:
+            filename = filename + "." + url_paths[-1]
+        return filename
+
+    def _extract_and_parse_job_post(self, cached: dict = None):
+        """Extract and parse the downloaded job post, reusing the page cache where possible.
+
+        A 304 answer or an unchanged page hash reuses the cached text and parsed job
+        without extraction or an LLM call; an unchanged text hash skips only the LLM
+        parse. Fresh results are stored in the page cache.
+
+        Args:
+            cached (dict, optional): The page cache entry of the URL.
+        """
+        if cached is not None and cached.get("parsed_job") and (
+            self.page_not_modified
+            or content_hash(self.job_post_html_data) == cached["html_hash"]
+        ):
+            config.logger.info("Job post unchanged since it was cached, reusing its parse")
+            self.job_post_raw = cached["job_text"]
+            self.extraction_report = cached["extraction_report"]
+            self.job_post = JobPost(self.job_post_raw, usage_log=self.usage_log)
+            self.parsed_job = self.job_post.parsed_job = cached["parsed_job"]
+            if self.page_not_modified:
+                job_page_cache.touch(self.url)
+            else:
+                self._cache_job_page()
+            return
+        self._extract_html_data()
+        self.job_post = self._new_job_post()
+        if cached is not None and cached.get("parsed_job") and (
+            content_hash(self.job_post_raw) == cached["text_hash"]
+        ):
+            config.logger.info("Job text unchanged since it was cached, skipping the parse")
+            self.parsed_job = self.job_post.parsed_job = cached["parsed_job"]
+        elif self._find_near_duplicate() is not None:
+            self.parsed_job = self.job_post.parsed_job = self.duplicate_of["parsed_job"]
+        else:
+            self.parsed_job = self.job_post.parse_job_post(verbose=False)
+            if self.job_post.chunk_stats:
+                self.extraction_report["parse_chunks"] = self.job_post.chunk_stats
+        self._cache_job_page()
+
+    def _new_job_post(self) -> JobPost:
+        """Create the JobPost for the LLM parse of the extracted job text.
+
+        Fields read from the page's structured data are passed as known fields, and its
+        list items that are too few to stand alone as extra fields. Its description
+        replaces the extracted text as LLM input when it is long enough.
+        """
+        posting = self.job_post_raw
+        if len(self.structured_description) >= config.JOB_TEXT_MIN_CHARS:
+            posting = self.structured_description
+        return JobPost(
+            posting,
+            usage_log=self.usage_log,
+            known_fields=self.structured_fields,
+            extra_fields=self.structured_extras,
+        )
+
+    def _find_near_duplicate(self) -> Optional[dict]:
+        """Look up a stored posting whose job text is a near-duplicate of this one.
+
+        Only matches whose folder still holds a `job.yaml` and whose header agrees with
+        this posting count, see `_duplicate_conflicts`. The match is stored in
+        `duplicate_of`, so the job reuses that folder's parse and tailored resume.
+
+        Returns:
+            dict: The match's `url`, `job_location`, Hamming `distance` and `parsed_job`, or None.
+        """
+        self.duplicate_of = None
+        if not self.reuse_duplicates or not self.job_post_raw:
+            return None
+        match = job_fingerprint_index.find(self.job_post_raw, exclude_url=self.url)
+        if match is None:
+            return None
+        job_file = os.path.join(match["job_location"], "job.yaml")
+        if not os.path.isfile(job_file):
+            return None
+        parsed_job = utils.read_yaml(filename=job_file) or {}
+        conflicts = self._duplicate_conflicts(match, parsed_job)
+        if conflicts:
+            config.logger.info(
+                f"Job post is close to {match['url']} (Hamming distance {match['distance']}) "
+                f"but differs in {', '.join(conflicts)}, parsing it on its own"
+            )
+            return None
+        config.logger.info(
+            f"Job post is a near-duplicate of {match['url']} (Hamming distance "
+            f"{match['distance']}), reusing {match['job_location']}"
+        )
+        self.duplicate_of = dict(match, parsed_job=parsed_job)
+        return self.duplicate_of
+
+    def _duplicate_conflicts(self, match: dict, parsed_job: dict) -> list[str]:
+        """List the header fields on which this posting and a near-duplicate differ.
+
+        The leading lines (title and company), location lines and pay figures of both
+        texts must match, see `job_header`. When this page has structured data, its
+        company, job title and salary must also equal those of the duplicate's parse.
+
+        Args:
+            match (dict): The `job_fingerprint_index` match.
+            parsed_job (dict): The parsed job stored in the match's folder.
+
+        Returns:
+            list[str]: The differing fields; empty when the duplicate can be reused.
+        """
+        conflicts = []
+        for field in ("company", "job_title", "salary"):
+            value = " ".join(str(parsed_job.get(field) or "").lower().split())
+            known = " ".join(str(self.structured_fields.get(field) or "").lower().split())
+            if known and value and known != value:
+                conflicts.append(field)
+        header = job_header(self.job_post_raw)
+        for field, label in (("head", "header"), ("location", "location"), ("pay", "salary")):
+            if header[field] != match["header"].get(field) and label not in conflicts:
+                conflicts.append(label)
+        return conflicts
+
+    def _cache_job_page(self):
+        """Store the downloaded page, its extracted text and the parsed job in the page cache."""
+        if not config.PAGE_CACHE_ENABLED or not self.job_post_html_data:
+            return
+        job_page_cache.set(
+            self.url,
+            self.job_post_html_data,
+            self.job_post_raw,
+            parsed_job=self.parsed_job,
+            extraction_report=self.extraction_report,
+            **self.page_validators,
+        )
 
     def parse_raw_job_post(self, raw_html):
         """Download and parse the job post from the provided URL.
@@ -178,59 +435,60 @@ class ResumeImprover:
         """
         self.job_post_html_data = raw_html
         self._extract_html_data()
-        self.job_post = JobPost(self.job_post_raw)
+        self.job_post = self._new_job_post()
         self.parsed_job = self.job_post.parse_job_post(verbose=False)
-        try:
-            filename = self.parsed_job["company"] + "_" + self.parsed_job["job_title"]
-            filename = filename.replace(" ", "_")
-        except KeyError:
-            if "://" in self.url:
-                filename = self.url.split("://")[1]
-            else:
-                filename = self.url
-            url_paths = filename.split("/")
-            filename = url_paths[0]
-            if len(url_paths) > 1:
-                filename = filename + "." + url_paths[-1]
-        self.clean_url = filename
+        self.clean_url = self._job_folder_name()
         filepath = os.path.join(config.DATA_PATH, self.clean_url)
         self.job_data_location = filepath
         os.makedirs(self.job_data_location, exist_ok=True)
+        self.usage_log.bind(self.job_data_location)
         utils.write_yaml(
             self.parsed_job, filename=os.path.join(self.job_data_location, "job.yaml")
         )
+        # Imported here so headless entry points never load Streamlit.
+        import streamlit as st
+
         st.session_state.resume_improver["job_description"] = self.parsed_job
 
     def create_draft_tailored_resume(
-        self, auto_open=True, manual_review=True, skip_pdf_create=False
+        self,
+        auto_open=True,
+        manual_review=True,
+        skip_pdf_create=False,
+        on_progress=None,
+        fast=None,
+        reuse_similar=None,
     ):
         """Run a full review of the resume against the job post.
 
         Args:
             auto_open (bool, optional): Whether to automatically open the generated resume. Defaults to True.
             manual_review (bool, optional): Whether to wait for manual review. Defaults to True.
+            skip_pdf_create (bool, optional): Whether to skip creating the PDF. Defaults to False.
+            on_progress (Callable[[str, Any], None], optional): Called with partial results as
+                soon as they are ready, possibly from worker threads. Events are the stage
+                names ("skills", "experiences", "projects") with the stage output, "experience"
+                and "project" with an `(index, section)` pair once a section is final, and
+                "experience_highlights" and "project_highlights" with an `(index, highlights)`
+                pair while highlights stream in.
+            fast (bool, optional): Use the fast-mode prompts and output schemas. Defaults to
+                `config.FAST_MODE`.
+            reuse_similar (bool, optional): Reuse the skills and highlights of a previous job
+                similar enough to this one instead of calling the LLM. Pass False to force a
+                fresh draft. Defaults to `config.SEMANTIC_REUSE_ENABLED`.
+
+        A job linked to a near-duplicate posting that already has a tailored resume opens
+        that resume, with the user's edits, instead of drafting a new one.
         """
-        config.logger.info("Extracting matched skills...")
-        self.skills = self.extract_matched_skills(verbose=False)
-        config.logger.info("Writing objective...")
-        # self.objective = self.write_objective(verbose=False)
-        config.logger.info("Updating bullet points...")
-        self.experiences = self.rewrite_unedited_experiences(verbose=False)
-        config.logger.info("Updating projects...")
-        self.projects = self.rewrite_unedited_projects(verbose=False)
-        config.logger.info("Done updating...")
-        self.yaml_loc = os.path.join(self.job_data_location, "resume.yaml")
-        resume_dict = dict(
-            editing=True,
-            basic=self.basic_info,
-            objective=self.objective,
-            education=self.education,
-            experiences=self.experiences,
-            projects=self.projects,
-            skills=self.skills,
-        )
-        utils.write_yaml(resume_dict, filename=self.yaml_loc)
-        self.resume_yaml = utils.read_yaml(filename=self.yaml_loc)
+        if not self._link_duplicate_resume(on_progress=on_progress):
+            self._run_tailoring_stages(
+                logger=config.logger,
+                include_objective=False,
+                on_progress=on_progress,
+                fast=fast,
+                reuse_similar=reuse_similar,
+            )
+            self._write_draft_resume()
         # if auto_open:
         #     subprocess.run(config.OPEN_FILE_COMMAND.split(" ") + [self.yaml_loc])
         while manual_review and utils.read_yaml(filename=self.yaml_loc)["editing"]:
@@ -239,8 +497,6 @@ class ResumeImprover:
         if not skip_pdf_create:
             self.create_pdf(auto_open=auto_open)
 
-    pass
-
     def _create_tailored_resume_in_background(
         self, auto_open=True, manual_review=True, background_runner=None
     ):
@@ -254,16 +510,416 @@ class ResumeImprover:
             logger = background_runner.logger
         else:
             logger = config.logger
-        logger.info("Extracting matched skills...")
-        self.skills = self.extract_matched_skills(verbose=False)
-        logger.info("Writing objective...")
-        self.objective = self.write_objective(verbose=False)
-        logger.info("Updating bullet points...")
-        self.experiences = self.rewrite_unedited_experiences(verbose=False)
-        logger.info("Updating projects...")
-        self.projects = self.rewrite_unedited_projects(verbose=False)
-        logger.info("Done updating...")
-        self.yaml_loc = os.path.join(self.job_data_location, "resume.yaml")
+        if not self._link_duplicate_resume(logger=logger):
+            self._run_tailoring_stages(logger=logger, include_objective=True)
+            self._write_draft_resume()
+
+    def retailor_changed_sections(
+        self, edited_resume: dict, on_progress=None, fast=None
+    ) -> dict:
+        """Re-run the tailoring of only what changed in the draft since it was generated.
+
+        The edited draft is compared with the last generated version (`resume_yaml`).
+        Every experience or project that is new or differs from all generated ones is
+        rewritten again from its edited content, and edited skills re-run the skills
+        matcher. Everything else keeps the user's edits. The result is written to
+        `resume.yaml` and becomes the baseline of the next comparison.
+
+        Args:
+            edited_resume (dict): The edited draft, as parsed from the review editor.
+            on_progress (Callable[[str, Any], None], optional): Receives the events of
+                `create_draft_tailored_resume`, with section indices into the edited draft.
+            fast (bool, optional): Use the fast-mode prompts and output schemas. Defaults to
+                `config.FAST_MODE`.
+
+        Returns:
+            dict: The re-run stages, mapped to the indices of the rewritten sections for
+                "experiences" and "projects" and to True for "skills". Empty if nothing changed.
+        """
+        previous = self.resume_yaml or {}
+        changes = {}
+        for key in ("experiences", "projects"):
+            indices = self._changed_section_indices(previous.get(key), edited_resume.get(key))
+            if indices:
+                changes[key] = indices
+        if edited_resume.get("skills") != previous.get("skills"):
+            changes["skills"] = True
+        self.basic_info = edited_resume.get("basic")
+        self.objective = edited_resume.get("objective")
+        self.education = edited_resume.get("education")
+        self.experiences = edited_resume.get("experiences")
+        self.projects = edited_resume.get("projects")
+        self.skills = edited_resume.get("skills")
+        if not changes:
+            config.logger.info("No changed sections to re-tailor")
+            return changes
+        config.logger.info(
+            "Re-tailoring "
+            + ", ".join(
+                key if value is True else f"{key} {value}" for key, value in changes.items()
+            )
+        )
+        self.section_stats = {}
+        scheduler = StageScheduler(logger=config.logger)
+        if "skills" in changes:
+            scheduler.add_stage(
+                "skills",
+                lambda **_: self.extract_matched_skills(verbose=False, fast=fast),
+                outputs=["skills"],
+            )
+        for key, kind in (("experiences", "experience"), ("projects", "project")):
+            if key in changes:
+                scheduler.add_stage(
+                    key,
+                    lambda key=key, kind=kind, **_: self._rewrite_section_subset(
+                        getattr(self, key), changes[key], kind, on_progress, fast
+                    ),
+                    outputs=[key],
+                )
+        on_stage_complete = None
+        if on_progress is not None:
+            on_stage_complete = lambda name, outputs: on_progress(name, outputs[name])
+        artifacts = scheduler.run(on_stage_complete=on_stage_complete)
+        for key in changes:
+            setattr(self, key, artifacts[key])
+        self._write_draft_resume()
+        return changes
+
+    @staticmethod
+    def _changed_section_indices(previous: list, edited: list) -> list[int]:
+        """Return the indices of edited sections that match no previous section exactly.
+
+        Sections are matched by content rather than position, so reordering or deleting
+        sections does not mark the others as changed.
+        """
+        remaining = list(previous or [])
+        changed = []
+        for i, section in enumerate(edited or []):
+            if section in remaining:
+                remaining.remove(section)
+            else:
+                changed.append(i)
+        return changed
+
+    def _rewrite_section_subset(
+        self, sections: list[dict], indices: list[int], kind: str, on_progress=None, fast=None
+    ) -> list[dict]:
+        """Rewrite the sections at `indices` and return every section, the others unchanged."""
+        remapped = None
+        if on_progress is not None:
+            remapped = lambda event, payload: on_progress(
+                event, (indices[payload[0]], payload[1])
+            )
+        rewritten = self._rewrite_sections(
+            [sections[i] for i in indices],
+            verbose=False,
+            fast=fast,
+            **self._section_progress_callbacks(remapped, kind),
+        )
+        result = [dict(section) for section in sections]
+        for i, section in zip(indices, rewritten):
+            result[i] = section
+        return result
+
+    def _build_tailoring_scheduler(
+        self, logger=None, include_objective=True, on_progress=None, fast=None
+    ):
+        """Declare the tailoring stages and their dependencies.
+
+        Every stage reads the parsed job and the base resume, and none reads another
+        stage's output, so all of them can run at the same time.
+
+        Args:
+            logger (logging.Logger, optional): Logger for stage progress.
+            include_objective (bool, optional): Whether to rewrite the objective. Defaults to True.
+            on_progress (Callable[[str, Any], None], optional): Receives per-section progress
+                of the experiences and projects stages.
+            fast (bool, optional): Use the fast-mode prompts and output schemas.
+
+        Returns:
+            StageScheduler: The scheduler holding the tailoring stages.
+        """
+        scheduler = StageScheduler(logger=logger)
+        base_inputs = ["parsed_job", "resume"]
+        scheduler.add_stage(
+            "skills",
+            lambda **_: self.extract_matched_skills(verbose=False, fast=fast),
+            inputs=base_inputs,
+            outputs=["skills"],
+        )
+        if include_objective:
+            scheduler.add_stage(
+                "objective",
+                lambda **_: self.write_objective(verbose=False, fast=fast),
+                inputs=base_inputs,
+                outputs=["objective"],
+            )
+        scheduler.add_stage(
+            "experiences",
+            lambda **_: self.rewrite_unedited_experiences(
+                verbose=False,
+                fast=fast,
+                **self._section_progress_callbacks(on_progress, "experience"),
+            ),
+            inputs=base_inputs,
+            outputs=["experiences"],
+        )
+        scheduler.add_stage(
+            "projects",
+            lambda **_: self.rewrite_unedited_projects(
+                verbose=False,
+                fast=fast,
+                **self._section_progress_callbacks(on_progress, "project"),
+            ),
+            inputs=base_inputs,
+            outputs=["projects"],
+        )
+        return scheduler
+
+    @staticmethod
+    def _section_progress_callbacks(on_progress, kind: str) -> dict:
+        """Map the section callbacks of `_rewrite_sections` onto `on_progress` events."""
+        if on_progress is None:
+            return {}
+        return dict(
+            on_section=lambda i, section: on_progress(kind, (i, section)),
+            on_partial=lambda i, highlights: on_progress(
+                f"{kind}_highlights", (i, highlights)
+            ),
+        )
+
+    def _run_tailoring_stages(
+        self,
+        logger=None,
+        include_objective=True,
+        on_progress=None,
+        fast=None,
+        reuse_similar=None,
+    ):
+        """Run the tailoring stages and store their outputs on the instance.
+
+        Outputs are only assigned once every stage has finished, so stages running in
+        parallel always read the untouched base resume. The outputs are then saved to
+        `tailoring.json` in the job folder, so later similar jobs can reuse them.
+
+        Args:
+            logger (logging.Logger, optional): Logger for stage progress.
+            include_objective (bool, optional): Whether to rewrite the objective. Defaults to True.
+            on_progress (Callable[[str, Any], None], optional): Receives each stage output as
+                soon as the stage finishes. See `create_draft_tailored_resume`.
+            fast (bool, optional): Use the fast-mode prompts and output schemas.
+            reuse_similar (bool, optional): Reuse the outputs of a similar previous job if
+                there is one. Defaults to `config.SEMANTIC_REUSE_ENABLED`.
+        """
+        logger = logger or config.logger
+        self.section_stats = {}
+        self.reused_from = None
+        fast = config.FAST_MODE if fast is None else fast
+        output_keys = ["skills", "experiences", "projects"]
+        if include_objective:
+            output_keys.insert(1, "objective")
+        resume_digest = resume_hash(self.resume)
+        config_digest = self._tailoring_config_digest(fast)
+        if config.SEMANTIC_REUSE_ENABLED if reuse_similar is None else reuse_similar:
+            if self._reuse_similar_tailoring(
+                output_keys, resume_digest, fast, on_progress, logger, config_digest
+            ):
+                return
+        scheduler = self._build_tailoring_scheduler(
+            logger=logger,
+            include_objective=include_objective,
+            on_progress=on_progress,
+            fast=fast,
+        )
+        on_stage_complete = None
+        if on_progress is not None:
+            on_stage_complete = lambda name, outputs: on_progress(name, outputs[name])
+        artifacts = scheduler.run(
+            dict(parsed_job=self.parsed_job, resume=self.resume),
+            on_stage_complete=on_stage_complete,
+        )
+        for key in ("skills", "objective", "experiences", "projects"):
+            if key in artifacts:
+                setattr(self, key, artifacts[key])
+        if self.job_data_location:
+            write_tailoring(
+                self.job_data_location,
+                resume_digest,
+                fast,
+                {key: artifacts[key] for key in output_keys},
+                config_digest=config_digest,
+            )
+        self.stage_timings = scheduler.timings
+        logger.info(
+            "Done updating... stage timings: "
+            + ", ".join(f"{k}={v:.2f}s" for k, v in self.stage_timings.items())
+        )
+        logger.info(
+            f"Sections reused: {self.section_stats.get('reused', 0)}, "
+            f"rewritten: {self.section_stats.get('rewritten', 0)}, "
+            f"failed: {self.section_stats.get('failed', 0)}"
+        )
+        limiter_metrics = rate_limiter.metrics()
+        logger.info(
+            f"Rate limiter: {limiter_metrics['throttled']} of {limiter_metrics['requests']} "
+            f"calls throttled, {limiter_metrics['wait_seconds']:.2f}s waited, max queue depth "
+            f"{limiter_metrics['max_queue_depth']}, {limiter_metrics['rate_limit_errors']} "
+            f"rate limit errors"
+        )
+        model_router.log_summary(logger)
+        for stage, totals in self.usage_log.summary().items():
+            logger.info(
+                f"{stage}: {totals['calls']} calls, {totals['prompt_tokens']} prompt tokens "
+                f"({totals['cached_tokens']} cached), {totals['completion_tokens']} completion "
+                f"tokens, {totals['latency_seconds']:.2f}s, ${totals['cost_usd']:.4f}"
+            )
+
+    def _tailoring_config_digest(self, fast: bool) -> str:
+        """Digest the prompts, routed models and options that shape the tailoring outputs.
+
+        Args:
+            fast (bool): Whether the run uses the fast-mode prompts.
+
+        Returns:
+            str: The `tailoring_digest` stored with the outputs and required for their reuse.
+        """
+        prompts, models = {}, {}
+        llm_kwargs = dict(self.llm_kwargs)
+        chat_model = llm_kwargs.pop("chat_model", config.CHAT_MODEL)
+        pinned_model = llm_kwargs.pop("model_name", None)
+        for prompt_type in TAILORING_PROMPT_TYPES:
+            if fast:
+                prompt_type = f"{prompt_type}_FAST"
+            prompts[prompt_type] = [
+                message_template(m) for m in Prompts.lookup.get(prompt_type) or []
+            ]
+            models[prompt_type] = pinned_model or model_router.route(prompt_type)
+        return tailoring_digest(
+            dict(
+                prompts=prompts,
+                models=models,
+                chat_model=getattr(chat_model, "__name__", chat_model),
+                llm_kwargs=sorted(llm_kwargs.items()),
+                escalation_model=config.ESCALATION_MODEL_NAME,
+                fast=bool(fast),
+                highlight_top_n=config.HIGHLIGHT_TOP_N,
+                section_batch_size=config.SECTION_BATCH_SIZE,
+            )
+        )
+
+    def _reuse_similar_tailoring(
+        self,
+        output_keys: list,
+        resume_digest: str,
+        fast: bool,
+        on_progress=None,
+        logger=None,
+        config_digest: str = None,
+    ) -> bool:
+        """Take the stage outputs of the most similar previous job if it is close enough.
+
+        Args:
+            output_keys (list): The stage outputs the run needs.
+            resume_digest (str): The `resume_hash` of the base resume; only jobs tailored from
+                the same resume are considered.
+            fast (bool): Whether the run uses the fast-mode prompts.
+            on_progress (Callable[[str, Any], None], optional): Receives each reused output.
+            logger (logging.Logger, optional): Logger for the reuse decision.
+            config_digest (str, optional): The `_tailoring_config_digest` of the run; only
+                jobs tailored with the same prompts, models and options are considered.
+
+        Returns:
+            bool: True if the outputs were reused and the tailoring stages can be skipped.
+        """
+        logger = logger or config.logger
+        location, score, outputs = job_similarity_index.load().most_similar(
+            self.parsed_job,
+            resume_digest,
+            fast=fast,
+            required_outputs=output_keys,
+            config_digest=config_digest,
+            exclude_location=self.job_data_location,
+        )
+        if location is None or score < config.SEMANTIC_REUSE_THRESHOLD:
+            logger.info(
+                f"No similar job to reuse (best similarity {score:.3f}, threshold "
+                f"{config.SEMANTIC_REUSE_THRESHOLD})"
+            )
+            return False
+        logger.info(f"Reusing the tailoring of {location} (similarity {score:.3f})")
+        self.reused_from = location
+        self.stage_timings = {}
+        for key in output_keys:
+            setattr(self, key, outputs[key])
+            if on_progress is not None:
+                on_progress(key, outputs[key])
+        return True
+
+    def _draft_filename(self) -> str:
+        """Return the file name of the job's draft resume.
+
+        A job linked to a near-duplicate whose resume was tailored from another base
+        resume writes its own `resume_<digest>.yaml`, so the existing draft is kept.
+        """
+        if self.duplicate_of is None:
+            return "resume.yaml"
+        tailored_from = self._tailored_resume_hash()
+        digest = resume_hash(self.resume)
+        if tailored_from is None or tailored_from == digest:
+            return "resume.yaml"
+        return f"resume_{digest[:12]}.yaml"
+
+    def _tailored_resume_hash(self) -> Optional[str]:
+        """Return the `resume_hash` the job folder's tailoring was run from, if recorded."""
+        try:
+            with open(
+                os.path.join(self.job_data_location, TAILORING_FILENAME), "r", encoding="utf-8"
+            ) as f:
+                return json.load(f).get("resume_hash")
+        except (OSError, ValueError):
+            return None
+
+    def _link_duplicate_resume(self, on_progress=None, logger=None) -> bool:
+        """Open the existing draft of the near-duplicate posting this job is linked to.
+
+        Tailoring a duplicate again would overwrite that draft and the user's edits to
+        it, so its resume is loaded as this job's draft and the stages are skipped.
+
+        Args:
+            on_progress (Callable[[str, Any], None], optional): Receives each loaded stage
+                output, like `create_draft_tailored_resume`.
+            logger (logging.Logger, optional): Logger for the decision.
+
+        Returns:
+            bool: True if the duplicate's draft was linked and no tailoring is needed.
+        """
+        logger = logger or config.logger
+        if self.duplicate_of is None or self._draft_filename() != "resume.yaml":
+            return False
+        yaml_loc = os.path.join(self.job_data_location, "resume.yaml")
+        if not os.path.isfile(yaml_loc):
+            return False
+        resume_yaml = utils.read_yaml(filename=yaml_loc) or {}
+        logger.info(
+            f"Job post duplicates {self.duplicate_of['url']}, opening its tailored resume "
+            f"{yaml_loc} instead of drafting a new one"
+        )
+        self.yaml_loc = yaml_loc
+        self.resume_yaml = resume_yaml
+        self.reused_from = self.job_data_location
+        self.stage_timings = {}
+        self.basic_info = resume_yaml.get("basic", self.basic_info)
+        self.education = resume_yaml.get("education", self.education)
+        for key in ("skills", "objective", "experiences", "projects"):
+            if key in resume_yaml:
+                setattr(self, key, resume_yaml[key])
+                if on_progress is not None and key != "objective":
+                    on_progress(key, resume_yaml[key])
+        return True
+
+    def _write_draft_resume(self):
+        """Write the tailored resume to the draft file in the job data folder, see `_draft_filename`."""
+        self.yaml_loc = os.path.join(self.job_data_location, self._draft_filename())
         resume_dict = dict(
             editing=True,
             basic=self.basic_info,
@@ -276,9 +932,14 @@ class ResumeImprover:
         utils.write_yaml(resume_dict, filename=self.yaml_loc)
         self.resume_yaml = utils.read_yaml(filename=self.yaml_loc)
 
+    @staticmethod
     def create_draft_tailored_resumes_in_background(background_configs: List[dict]):
         """Run 'create_draft_tailored_resume' for multiple configurations in the background.
 
+        Returns immediately. The improvers are built lazily, the pages are fetched
+        concurrently on a background thread, and each job is parsed and tailored once
+        on its own worker thread as soon as its page arrives.
+
         Args:
             background_configs (List[dict]): List of configurations for creating draft tailored resumes.
                 Each configuration dictionary should have the following keys:
@@ -286,59 +947,122 @@ class ResumeImprover:
                 - resume_location (str): The file path to the resume to be tailored.
                 - auto_open (bool, optional): Whether to automatically open the generated resume. Defaults to True.
                 - manual_review (bool, optional): Whether to wait for manual review. Defaults to True.
+
+        Returns:
+            dict: The `ResumeImprovers`, whose job fields are filled in by their workers, and
+                the `background_runner` running them.
         """
         output = {}
         output["ResumeImprovers"] = []
         output["background_runner"] = BackgroundRunner()
+        jobs_by_url = {}
 
-        def run_config(background_config, resume_improver):
+        def run_config(background_config, resume_improver, html=None):
             try:
-                resume_improver.download_and_parse_job_post()
+                resume_improver.download_and_parse_job_post(html=html)
                 resume_improver._create_tailored_resume_in_background(
                     auto_open=background_config.get("auto_open", True),
                     manual_review=background_config.get("manual_review", True),
                 )
             except Exception as e:
                 output["background_runner"].logger.error(
-                    f"An error occurred with config {config}: {e}"
+                    f"An error occurred with config {background_config}: {e}"
                 )
 
-        for background_config in background_configs:
-            output["ResumeImprovers"].append(
-                ResumeImprover(
-                    url=background_config["url"],
-                    resume_location=background_config.get("resume_location"),
+        def dispatch():
+            # Pages that fail to prefetch are downloaded again, with retries, by their worker.
+            remaining = dict(jobs_by_url)
+            try:
+                for result in iter_fetched(jobs_by_url):
+                    for background_config, resume_improver in remaining.pop(result["url"], []):
+                        output["background_runner"].run_in_background(
+                            run_config, background_config, resume_improver, result["text"]
+                        )
+            except Exception as e:
+                output["background_runner"].logger.error(
+                    f"Prefetching the job posts failed, {len(remaining)} jobs will download "
+                    f"their own page: {e}"
                 )
+            finally:
+                for jobs in remaining.values():
+                    for background_config, resume_improver in jobs:
+                        output["background_runner"].run_in_background(
+                            run_config, background_config, resume_improver
+                        )
+
+        for background_config in background_configs:
+            resume_improver = ResumeImprover(
+                url=background_config["url"],
+                resume_location=background_config.get("resume_location"),
+                lazy=True,
             )
-            output["background_runner"].run_in_background(
-                run_config, background_config, output["ResumeImprovers"][-1]
+            output["ResumeImprovers"].append(resume_improver)
+            jobs_by_url.setdefault(background_config["url"], []).append(
+                (background_config, resume_improver)
             )
+        output["background_runner"].run_in_background(dispatch)
         return output
 
-    def _get_formatted_chain_inputs(self, chain, section=None):
+    def _get_formatted_chain_inputs(self, chain, section=None, **extra_inputs):
         output_dict = {}
         raw_self_data = self.__dict__
-        if section is not None:
+        if section is not None or extra_inputs:
             raw_self_data = raw_self_data.copy()
+            raw_self_data.update(extra_inputs)
+        if section is not None:
             raw_self_data["section"] = section
-        for key in chain.get_input_schema().schema()["required"]:
+        for key in chain.required_inputs:
             output_dict[key] = chain_formatter(
                 key, raw_self_data.get(key) or self.parsed_job.get(key)
             )
         return output_dict
 
     def _chain_updater(
-        self, prompt_msgs, pydantic_object, **chain_kwargs
-    ) -> RunnableSequence:
-        """Create a chain based on the prompt messages.
+        self, prompt_type: str, pydantic_object, streaming=False, fast=None, **chain_kwargs
+    ) -> CompiledChain:
+        """Return the compiled chain for a prompt, built once and reused across calls.
+
+        Args:
+            prompt_type (str): The `Prompts.lookup` key of the prompt.
+            pydantic_object: The output schema.
+            streaming (bool, optional): Return a chain that streams partial output as dicts.
+                Defaults to False.
+            fast (bool, optional): Use the `<TYPE>_FAST` prompt and the slim output schema
+                that only asks for the final answer. Defaults to `config.FAST_MODE`.
+
+        The chain uses the model routed to the prompt type in `config.MODEL_ROUTES`, unless
+        `llm_kwargs` pins a `model_name`.
+
+        Returns:
+            CompiledChain: The chain for highlighting resume sections, matching skills, or improving resume content.
+        """
+        if config.FAST_MODE if fast is None else fast:
+            prompt_type = f"{prompt_type}_FAST"
+            pydantic_object = FAST_OUTPUT_SCHEMAS[pydantic_object]
+        llm_kwargs = dict(self.llm_kwargs)
+        llm_kwargs.setdefault("model_name", model_router.route(prompt_type))
+        return chain_registry.get(
+            prompt_type, pydantic_object, llm_kwargs, streaming=streaming
+        )
+
+    def _invoke_chain(self, chain, chain_inputs: dict):
+        """Invoke a chain with the callback that records its usage, latency and cost.
+
+        Outputs of a routed model that fail local validation are retried on
+        `config.ESCALATION_MODEL_NAME`, see `ModelRouter.invoke`. The call waits for one of
+        the job's `config.MAX_CONCURRENT_WORKERS` LLM slots, which the stage scheduler
+        and the section workers share.
+
+        Args:
+            chain (CompiledChain): The chain to invoke.
+            chain_inputs (dict): The formatted chain inputs.
 
         Returns:
-            RunnableSequence: The chain for highlighting resume sections, matching skills, or improving resume content.
+            The structured output of the chain.
         """
-        prompt = ChatPromptTemplate(messages=prompt_msgs)
-        llm = create_llm(**self.llm_kwargs)
-        runnable = prompt | llm.with_structured_output(schema=pydantic_object)
-        return runnable
+        callbacks = [self.usage_log.callback(chain.prompt_type)]
+        with self._llm_slots:
+            return model_router.invoke(chain, chain_inputs, callbacks=callbacks)
 
     def _get_degrees(self, resume: dict):
         """Extract degrees from the resume.
@@ -387,59 +1111,327 @@ class ResumeImprover:
             else:
                 l1.append(s)
 
-    def rewrite_section(self, section: list | str, **chain_kwargs) -> dict:
+    def rewrite_section(self, section: list | str, on_partial=None, **chain_kwargs) -> dict:
         """Rewrite a section of the resume.
 
         Args:
             section (list | str): The section to rewrite.
+            on_partial (Callable[[list[str]], None], optional): Called with the highlights
+                received so far while the response streams in. Streaming is only used when
+                this is given and `config.STREAM_HIGHLIGHTS` is set.
             **chain_kwargs: Additional keyword arguments for the chain.
 
         Returns:
             dict: The rewritten section.
         """
+        section_revised = None
+        if on_partial is not None and config.STREAM_HIGHLIGHTS:
+            try:
+                section_revised = self._stream_section_highlights(
+                    section, on_partial, **chain_kwargs
+                )
+            except Exception as e:
+                config.logger.warning(
+                    f"Streaming rewrite failed, retrying without streaming: {e}"
+                )
+        if section_revised is None:
+            chain = self._chain_updater(
+                "SECTION_HIGHLIGHTER",
+                ResumeSectionHighlighterOutput,
+                **chain_kwargs,
+            )
+            chain_inputs = self._get_formatted_chain_inputs(chain=chain, section=section)
+            section_revised = self._invoke_chain(chain, chain_inputs).dict()
+        section_revised = sorted(
+            section_revised["final_answer"], key=lambda d: d["relevance"] * -1
+        )
+        return [s["highlight"] for s in section_revised]
+
+    def _stream_section_highlights(
+        self, section: list | str, on_partial, **chain_kwargs
+    ) -> dict:
+        """Rewrite a section while streaming, publishing highlights as they arrive.
+
+        Args:
+            section (list | str): The section to rewrite.
+            on_partial (Callable[[list[str]], None]): Called with the highlights received so far.
+            **chain_kwargs: Additional keyword arguments for the chain.
+
+        Returns:
+            dict: The validated highlighter output.
+        """
         chain = self._chain_updater(
-            Prompts.lookup["SECTION_HIGHLIGHTER"],
+            "SECTION_HIGHLIGHTER",
             ResumeSectionHighlighterOutput,
+            streaming=True,
             **chain_kwargs,
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain, section=section)
-        section_revised = chain.invoke(chain_inputs).dict()
-        section_revised = sorted(
-            section_revised["final_answer"], key=lambda d: d["relevance"] * -1
+        callbacks = [self.usage_log.callback(chain.prompt_type)]
+        last = None
+        published = []
+        with self._llm_slots:
+            for partial in chain.stream(chain_inputs, config={"callbacks": callbacks}):
+                last = partial
+                highlights = [
+                    item["highlight"]
+                    for item in (partial or {}).get("final_answer") or []
+                    if isinstance(item, dict) and item.get("highlight")
+                ]
+                if highlights != published:
+                    published = highlights
+                    on_partial(highlights)
+        return chain.pydantic_object(**(last or {})).dict()
+
+    def _rewrite_sections(
+        self, sections: list[dict], on_section=None, on_partial=None, **chain_kwargs
+    ) -> list[dict]:
+        """Rewrite the highlights of several resume sections concurrently.
+
+        Sections with more than `config.HIGHLIGHT_TOP_N` highlights are sent to the LLM
+        trimmed to the ones that best match the job (see `_prerank_highlights`). Sections
+        whose memoization key is unchanged since a previous rewrite reuse the stored
+        highlights without calling the LLM. The rest are rewritten with at most
+        `config.MAX_CONCURRENT_WORKERS` calls at once. Results keep the order of
+        `sections`, and a section whose rewrite fails keeps all of its original
+        highlights, untrimmed, so one bad call does not sink the others.
+
+        Args:
+            sections (list[dict]): The sections (experiences or projects) to rewrite.
+            on_section (Callable[[int, dict], None], optional): Called with the index and the
+                final section as soon as each section is done.
+            on_partial (Callable[[int, list[str]], None], optional): Called with the index and
+                the highlights received so far while a single-section rewrite streams in.
+            **chain_kwargs: Additional keyword arguments for the chain.
+
+        Returns:
+            list[dict]: The rewritten sections, in input order.
+        """
+        result = [dict(section) for section in sections or []]
+        if not result:
+            return result
+        prompt_sections = self._prerank_highlights(result)
+        memo_keys = {}
+        pending = []
+        for i, section in enumerate(prompt_sections):
+            if config.SECTION_MEMO_ENABLED:
+                memo_keys[i] = self._section_memo_key(
+                    section, fast=chain_kwargs.get("fast")
+                )
+                highlights = section_memo.get(memo_keys[i])
+                if highlights is not None:
+                    result[i]["highlights"] = highlights
+                    self._record_section_stat("reused")
+                    if on_section is not None:
+                        on_section(i, result[i])
+                    continue
+            pending.append(i)
+        if not pending:
+            return result
+        batch_size = max(1, config.SECTION_BATCH_SIZE)
+        max_workers = min(config.MAX_CONCURRENT_WORKERS, len(pending))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+
+            def submit_section(i):
+                partial = None
+                if on_partial is not None:
+                    partial = lambda highlights: on_partial(i, highlights)
+                future = executor.submit(
+                    self.rewrite_section,
+                    section=prompt_sections[i],
+                    on_partial=partial,
+                    **chain_kwargs,
+                )
+                futures[future] = [i]
+
+            def submit_batch(indices):
+                batch = {f"section_{i}": prompt_sections[i] for i in indices}
+                future = executor.submit(self.rewrite_sections_batch, batch, **chain_kwargs)
+                futures[future] = indices
+
+            for start in range(0, len(pending), batch_size):
+                indices = pending[start : start + batch_size]
+                if len(indices) == 1:
+                    submit_section(indices[0])
+                else:
+                    submit_batch(indices)
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    indices = futures.pop(future)
+                    if len(indices) > 1:
+                        try:
+                            batch_result = future.result()
+                        except Exception as e:
+                            config.logger.warning(
+                                f"Batched rewrite failed, falling back to single sections: {e}"
+                            )
+                            batch_result = {}
+                        for i in indices:
+                            if f"section_{i}" in batch_result:
+                                self._store_rewritten_section(
+                                    result, i, batch_result[f"section_{i}"], memo_keys
+                                )
+                                if on_section is not None:
+                                    on_section(i, result[i])
+                            else:
+                                submit_section(i)
+                        continue
+                    i = indices[0]
+                    try:
+                        self._store_rewritten_section(
+                            result, i, future.result(), memo_keys
+                        )
+                    except Exception as e:
+                        name = result[i].get("company") or result[i].get("name") or i
+                        config.logger.error(f"Failed to rewrite section {name}: {e}")
+                        self._record_section_stat("failed")
+                    if on_section is not None:
+                        on_section(i, result[i])
+        return result
+
+    def _prerank_highlights(self, sections: list[dict]) -> list[dict]:
+        """Return copies of the sections trimmed to their `config.HIGHLIGHT_TOP_N` best highlights.
+
+        Highlights are scored with BM25 against the job's ATS keywords, technical skills
+        and duties, with term statistics taken from every highlight of the base resume.
+        The sections themselves are left untouched.
+
+        Args:
+            sections (list[dict]): The sections about to be rewritten.
+
+        Returns:
+            list[dict]: The sections to send to the highlighter, in input order.
+        """
+        top_n = config.HIGHLIGHT_TOP_N
+        if top_n is None:
+            return list(sections)
+        corpus = [
+            highlight
+            for section in (self.experiences or []) + (self.projects or [])
+            for highlight in section.get("highlights") or []
+        ]
+        ranker = HighlightRanker(self.parsed_job, corpus)
+        trimmed = []
+        for section in sections:
+            highlights = section.get("highlights")
+            if not isinstance(highlights, list) or len(highlights) <= top_n:
+                trimmed.append(section)
+                continue
+            trimmed.append(dict(section, highlights=ranker.top(highlights, top_n)))
+            name = section.get("company") or section.get("name")
+            config.logger.info(
+                f"Pre-ranking kept {top_n} of {len(highlights)} highlights of {name}"
+            )
+        return trimmed
+
+    def _store_rewritten_section(
+        self, result: list[dict], i: int, highlights: list[str], memo_keys: dict
+    ):
+        """Store rewritten highlights in `result` and memoize them."""
+        result[i]["highlights"] = highlights
+        self._record_section_stat("rewritten")
+        if i in memo_keys:
+            section_memo.set(memo_keys[i], highlights)
+
+    def _section_memo_key(self, section: dict, fast: bool = None) -> str:
+        """Build the memoization key of a section for the current job, prompt and model.
+
+        Args:
+            section (dict): The resume section to rewrite.
+            fast (bool, optional): Whether the fast-mode prompt is used. Defaults to `config.FAST_MODE`.
+
+        Returns:
+            str: The memoization key.
+        """
+        prompt_type = "SECTION_HIGHLIGHTER"
+        if config.FAST_MODE if fast is None else fast:
+            prompt_type = "SECTION_HIGHLIGHTER_FAST"
+        prompt_msgs = Prompts.lookup[prompt_type]
+        job_keys = ChatPromptTemplate(messages=prompt_msgs).input_variables
+        job_fields = {
+            key: self.parsed_job.get(key) for key in job_keys if key != "section"
+        }
+        llm_kwargs = dict(self.llm_kwargs)
+        chat_model = llm_kwargs.pop("chat_model", config.CHAT_MODEL)
+        model = "{}:{}:{}".format(
+            getattr(chat_model, "__name__", chat_model),
+            llm_kwargs.pop("model_name", model_router.route(prompt_type)),
+            sorted(llm_kwargs.items()),
         )
-        return [s["highlight"] for s in section_revised]
+        return section_memo_key(section, job_fields, prompt_msgs, model)
+
+    def _record_section_stat(self, outcome: str):
+        """Increment the per-run count of reused, rewritten or failed sections."""
+        with self._stats_lock:
+            self.section_stats[outcome] = self.section_stats.get(outcome, 0) + 1
+
+    def rewrite_sections_batch(self, sections: dict, **chain_kwargs) -> dict:
+        """Rewrite several sections of the resume in one LLM call.
+
+        Args:
+            sections (dict): Mapping of section id to the section to rewrite.
+            **chain_kwargs: Additional keyword arguments for the chain.
+
+        Returns:
+            dict: Mapping of section id to its rewritten highlights. Ids the model left
+                out, or returned without highlights, are missing from the result.
+        """
+        chain = self._chain_updater(
+            "SECTION_BATCH_HIGHLIGHTER",
+            ResumeSectionBatchHighlighterOutput,
+            **chain_kwargs,
+        )
+        chain_inputs = self._get_formatted_chain_inputs(
+            chain=chain, sections=format_sections_for_batch_prompt(sections)
+        )
+        batch_revised = self._invoke_chain(chain, chain_inputs).dict()
+        result = {}
+        for item in batch_revised.get("sections") or []:
+            if item["section_id"] not in sections or not item["final_answer"]:
+                continue
+            section_revised = sorted(
+                item["final_answer"], key=lambda d: d["relevance"] * -1
+            )
+            result[item["section_id"]] = [s["highlight"] for s in section_revised]
+        return result
 
-    def rewrite_unedited_experiences(self, **chain_kwargs) -> dict:
+    def rewrite_unedited_experiences(
+        self, on_section=None, on_partial=None, **chain_kwargs
+    ) -> dict:
         """Rewrite unedited experiences in the resume.
 
         Args:
+            on_section (Callable[[int, dict], None], optional): See `_rewrite_sections`.
+            on_partial (Callable[[int, list[str]], None], optional): See `_rewrite_sections`.
             **chain_kwargs: Additional keyword arguments for the chain.
 
         Returns:
             dict: The rewritten experiences.
         """
-        result = []
-        for exp in self.experiences:
-            exp = dict(exp)
-            exp["highlights"] = self.rewrite_section(section=exp, **chain_kwargs)
-            result.append(exp)
-        return result
+        return self._rewrite_sections(
+            self.experiences, on_section=on_section, on_partial=on_partial, **chain_kwargs
+        )
 
-    def rewrite_unedited_projects(self, **chain_kwargs) -> dict:
+    def rewrite_unedited_projects(
+        self, on_section=None, on_partial=None, **chain_kwargs
+    ) -> dict:
         """Rewrite unedited projects in the resume.
 
         Args:
+            on_section (Callable[[int, dict], None], optional): See `_rewrite_sections`.
+            on_partial (Callable[[int, list[str]], None], optional): See `_rewrite_sections`.
             **chain_kwargs: Additional keyword arguments for the chain.
 
         Returns:
             dict: The rewritten projects.
         """
-        result = []
-        for exp in self.projects:
-            exp = dict(exp)
-            exp["highlights"] = self.rewrite_section(section=exp, **chain_kwargs)
-            result.append(exp)
-        return result
+        return self._rewrite_sections(
+            self.projects, on_section=on_section, on_partial=on_partial, **chain_kwargs
+        )
 
     def extract_matched_skills(self, **chain_kwargs) -> dict:
         """Extract matched skills from the resume and job post.
@@ -452,10 +1444,10 @@ class ResumeImprover:
         """
 
         chain = self._chain_updater(
-            Prompts.lookup["SKILLS_MATCHER"], ResumeSkillsMatcherOutput, **chain_kwargs
+            "SKILLS_MATCHER", ResumeSkillsMatcherOutput, **chain_kwargs
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
-        extracted_skills = chain.invoke(chain_inputs).dict()
+        extracted_skills = self._invoke_chain(chain, chain_inputs).dict()
         if not extracted_skills or "final_answer" not in extracted_skills:
             return None
         extracted_skills = extracted_skills["final_answer"]
@@ -484,11 +1476,11 @@ class ResumeImprover:
             dict: The written objective.
         """
         chain = self._chain_updater(
-            Prompts.lookup["OBJECTIVE_WRITER"], ResumeSummarizerOutput, **chain_kwargs
+            "OBJECTIVE_WRITER", ResumeSummarizerOutput, **chain_kwargs
         )
 
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
-        objective = chain.invoke(chain_inputs).dict()
+        objective = self._invoke_chain(chain, chain_inputs).dict()
         if not objective or "final_answer" not in objective:
             return None
         return objective["final_answer"]
@@ -503,10 +1495,10 @@ class ResumeImprover:
             dict: The suggested improvements.
         """
         chain = self._chain_updater(
-            Prompts.lookup["IMPROVER"], ResumeImproverOutput, **chain_kwargs
+            "IMPROVER", ResumeImproverOutput, **chain_kwargs
         )
         chain_inputs = self._get_formatted_chain_inputs(chain=chain)
-        improvements = chain.invoke(chain_inputs).dict()
+        improvements = self._invoke_chain(chain, chain_inputs).dict()
         if not improvements or "final_answer" not in improvements:
             return None
         return improvements["final_answer"]
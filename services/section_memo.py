@@ -0,0 +1,89 @@
+import json
+import hashlib
+from typing import Optional
+import config
+from .sqlite_store import SQLiteLRUStore
+
+
+def message_template(message) -> str:
+    """Return the raw template text of a prompt message."""
+    if hasattr(message, "prompt"):
+        return message.prompt.template
+    return message.content
+
+
+def section_memo_key(
+    section: dict, job_fields: dict, prompt_msgs: list, model: str
+) -> str:
+    """Build the memoization key of a section rewrite.
+
+    Args:
+        section (dict): The resume section sent to the highlighter.
+        job_fields (dict): The parsed job fields the prompt reads.
+        prompt_msgs (list): The prompt messages used for the rewrite.
+        model (str): Identifier of the model and its sampling settings.
+
+    Returns:
+        str: A SHA-256 hex digest that changes whenever any of the inputs change.
+    """
+    payload = dict(
+        section=section,
+        job_fields=job_fields,
+        prompt=[message_template(m) for m in prompt_msgs],
+        model=model,
+    )
+    serialized = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class SectionMemo:
+    """Persistent store of rewritten section highlights keyed by `section_memo_key`.
+
+    Least recently used entries are evicted once the stored size exceeds the quota, so
+    entries left behind by prompt or model changes do not accumulate.
+    """
+
+    def __init__(self, database_path: str = None, max_bytes: int = None):
+        """Initialize the memo and create its table if needed.
+
+        Args:
+            database_path (str, optional): Path to the SQLite file. Defaults to `config.SECTION_MEMO_PATH`.
+            max_bytes (int, optional): Maximum total size of the entries. Defaults to `config.SECTION_MEMO_MAX_BYTES`.
+        """
+        self.database_path = database_path or config.SECTION_MEMO_PATH
+        self.max_bytes = max_bytes or config.SECTION_MEMO_MAX_BYTES
+        self._store = SQLiteLRUStore(
+            self.database_path,
+            "section_memo",
+            """key TEXT PRIMARY KEY,
+            highlights TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            size INTEGER NOT NULL,
+            accessed_at REAL NOT NULL""",
+            self.max_bytes,
+        )
+
+    def get(self, key: str) -> Optional[list[str]]:
+        """Return the memoized highlights for `key`, refreshing its LRU position, or None on a miss."""
+        row = self._store.get(key, "highlights")
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, highlights: list[str]) -> None:
+        """Memoize the highlights produced for `key`, then evict down to the size quota."""
+        value = json.dumps(highlights)
+        size = len(value.encode("utf-8"))
+        self._store.put(key, dict(highlights=value), size)
+
+    def clear(self) -> None:
+        """Remove every memoized section."""
+        self._store.clear()
+
+    def stats(self) -> dict:
+        """Return process-wide reuse counters with the number and size of stored sections."""
+        stats = self._store.stats()
+        return dict(reused=stats.pop("hits"), rewritten=stats.pop("misses"), **stats)
+
+
+section_memo = SectionMemo()
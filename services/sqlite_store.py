@@ -0,0 +1,139 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SQLiteLRUStore:
+    """SQLite table of keyed entries with a byte-size quota and least recently used eviction.
+
+    Shared by the LLM response cache, the page cache and the section memo. The table is
+    created from `columns`, a SQL column list that must define `key TEXT PRIMARY KEY`,
+    `size INTEGER NOT NULL`, `created_at REAL NOT NULL` and `accessed_at REAL NOT NULL`.
+    Every access refreshes `accessed_at`, and writes evict the oldest entries until the
+    stored `size` fits in `max_bytes`. Hit, miss and eviction counters cover the process.
+    """
+
+    def __init__(self, database_path: str, table: str, columns: str, max_bytes: int):
+        """Open the database in WAL mode and create the table and its LRU index if needed.
+
+        Args:
+            database_path (str): Path to the SQLite file.
+            table (str): Name of the table.
+            columns (str): SQL column definitions of the table.
+            max_bytes (int): Maximum total `size` of the entries.
+        """
+        self.database_path = database_path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.database_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.database_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, columns: str, max_age: float = None) -> Optional[tuple]:
+        """Return the given columns of the entry at `key`, refreshing its LRU position.
+
+        Args:
+            key (str): The entry key.
+            columns (str): Comma-separated columns to select.
+            max_age (float, optional): Entries created longer ago than this many seconds
+                are deleted and count as misses. None never expires entries.
+
+        Returns:
+            tuple: The selected values, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {columns}, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and max_age and now - row[-1] > max_age:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return row[:-1]
+
+    def put(self, key: str, values: dict, size: int) -> bool:
+        """Insert or replace the entry at `key`, then evict down to the quota.
+
+        Args:
+            key (str): The entry key.
+            values (dict): The other columns of the entry, besides the LRU bookkeeping.
+            size (int): Size of the entry in bytes.
+
+        Returns:
+            bool: False if the entry alone exceeds `max_bytes` and was not stored.
+        """
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        row = dict(values, key=key, size=size, created_at=now, accessed_at=now)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(row)}) "
+                f"VALUES ({', '.join('?' for _ in row)})",
+                tuple(row.values()),
+            )
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def execute(self, sql: str, parameters: tuple = ()):
+        """Run and commit a statement on the table's database under the store lock."""
+        with self._lock:
+            self._conn.execute(sql, parameters)
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the table fits in `max_bytes`."""
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC")
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self):
+        """Remove every entry."""
+        self.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        """Return the hit, miss and eviction counters with the number and size of entries."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=entries,
+            bytes=size,
+            max_bytes=self.max_bytes,
+        )
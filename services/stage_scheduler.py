@@ -0,0 +1,166 @@
+import time
+import concurrent.futures
+from typing import Callable, Iterable, Optional
+import config
+
+
+class Stage:
+    """A unit of pipeline work with declared inputs and outputs."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+    ):
+        """Initialize a Stage.
+
+        Args:
+            name (str): Unique name of the stage.
+            func (Callable): Called with the stage inputs as keyword arguments. Returns the
+                single output value, or a tuple with one value per declared output.
+            inputs (Iterable[str], optional): Names of the artifacts the stage reads.
+            outputs (Iterable[str], optional): Names of the artifacts the stage produces.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def run(self, artifacts: dict) -> dict:
+        """Run the stage against the available artifacts and return its outputs."""
+        value = self.func(**{key: artifacts[key] for key in self.inputs})
+        if len(self.outputs) == 1:
+            return {self.outputs[0]: value}
+        if not self.outputs:
+            return {}
+        return dict(zip(self.outputs, value))
+
+
+class StageScheduler:
+    """Run pipeline stages in dependency order, in parallel where possible.
+
+    A stage starts as soon as every artifact it declares as input is available,
+    either from the initial artifacts or from the outputs of a finished stage.
+    """
+
+    def __init__(self, max_workers: int = None, logger=None):
+        """Initialize the StageScheduler.
+
+        Args:
+            max_workers (int, optional): Maximum number of stages running at once.
+                Defaults to `config.MAX_CONCURRENT_WORKERS`.
+            logger (logging.Logger, optional): Logger for stage progress. Defaults to `config.logger`.
+        """
+        self.max_workers = max_workers or config.MAX_CONCURRENT_WORKERS
+        self.logger = logger or config.logger
+        self.stages = {}
+        self.timings = {}
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable,
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+    ) -> "StageScheduler":
+        """Register a stage. See `Stage` for the meaning of the arguments.
+
+        Returns:
+            StageScheduler: The scheduler, so calls can be chained.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage `{name}` is already registered.")
+        self.stages[name] = Stage(name, func, inputs=inputs, outputs=outputs)
+        return self
+
+    def _validate(self, available: set):
+        """Check that outputs are unique and that every input can be produced.
+
+        Args:
+            available (set): Names of the initial artifacts.
+
+        Raises:
+            ValueError: If the stage graph cannot be run to completion.
+        """
+        producers = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers or output in available:
+                    raise ValueError(f"Artifact `{output}` is produced more than once.")
+                producers[output] = stage.name
+        resolved = set(available)
+        pending = list(self.stages.values())
+        while pending:
+            ready = [s for s in pending if all(i in resolved for i in s.inputs)]
+            if not ready:
+                names = ", ".join(s.name for s in pending)
+                raise ValueError(f"Stages have unsatisfiable or cyclic inputs: {names}")
+            for stage in ready:
+                resolved.update(stage.outputs)
+                pending.remove(stage)
+
+    def run(
+        self,
+        artifacts: Optional[dict] = None,
+        on_stage_complete: Optional[Callable[[str, dict], None]] = None,
+    ) -> dict:
+        """Run every registered stage.
+
+        Args:
+            artifacts (dict, optional): Initial artifacts available to the stages.
+            on_stage_complete (Callable[[str, dict], None], optional): Called with the stage
+                name and its outputs as soon as each stage finishes, so callers can publish
+                partial results before the whole pipeline is done.
+
+        Returns:
+            dict: The initial artifacts together with every stage output.
+
+        Raises:
+            Exception: The first exception raised by a stage, once running stages have finished.
+        """
+        artifacts = dict(artifacts or {})
+        self._validate(set(artifacts))
+        self.timings = {}
+        pending = dict(self.stages)
+        running = {}
+        error = None
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name, stage in list(pending.items()):
+                        if all(i in artifacts for i in stage.inputs):
+                            self.logger.info(f"Starting stage {name}...")
+                            future = executor.submit(self._timed_run, stage, dict(artifacts))
+                            running[future] = stage
+                            del pending[name]
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        outputs = future.result()
+                        artifacts.update(outputs)
+                        self.logger.info(
+                            f"Finished stage {stage.name} in {self.timings[stage.name]:.2f}s"
+                        )
+                        if on_stage_complete is not None:
+                            on_stage_complete(stage.name, outputs)
+                    except Exception as e:
+                        self.logger.error(f"Stage {stage.name} failed: {e}")
+                        error = error or e
+        if error is not None:
+            raise error
+        return artifacts
+
+    def _timed_run(self, stage: Stage, artifacts: dict) -> dict:
+        """Run a stage and record its wall-clock duration."""
+        start = time.perf_counter()
+        try:
+            return stage.run(artifacts)
+        finally:
+            self.timings[stage.name] = time.perf_counter() - start
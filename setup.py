@@ -11,6 +11,9 @@ setup(
     install_requires=[
         "beautifulsoup4>=4.9.3",
         "configparser>=5.0.2",
+        "lxml>=5.2.2",
+        "numpy>=1.26",
+        "httpx[brotli]>=0.27",
         "langchain==0.1.20",
         "langchain-openai==0.1.6",
         "langchain-core==0.1.52",
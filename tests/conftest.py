@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# `services` must be imported before `models`, which depends on it.
+import services  # noqa: E402
+import config  # noqa: E402
+from config import config as config_module  # noqa: E402
+from langchain_core.globals import get_llm_cache, set_llm_cache  # noqa: E402
+
+
+@pytest.fixture
+def offline_pipeline(monkeypatch, tmp_path):
+    """Run the pipeline offline on the fake chat model, with every store under `tmp_path`."""
+    for module in (config, config_module):
+        monkeypatch.setattr(module, "CHAT_MODEL", services.FakeStructuredChatModel)
+        monkeypatch.setattr(module, "DATA_PATH", str(tmp_path / "data"))
+        monkeypatch.setattr(module, "FAKE_LLM_LATENCY", 0.0)
+        monkeypatch.setattr(module, "FAKE_LLM_JITTER", 0.0)
+        monkeypatch.setattr(module, "PAGE_CACHE_ENABLED", False)
+        monkeypatch.setattr(module, "SECTION_MEMO_ENABLED", False)
+        monkeypatch.setattr(module, "SEMANTIC_REUSE_ENABLED", False)
+    resume_improver = sys.modules["services.resume_improver"]
+    monkeypatch.setattr(
+        resume_improver,
+        "job_fingerprint_index",
+        services.JobFingerprintIndex(str(tmp_path / "job_fingerprints.sqlite3")),
+    )
+    monkeypatch.setattr(sys.modules["services.rate_limiter"].rate_limiter, "token_bucket", None)
+    monkeypatch.setattr(
+        sys.modules["services.llm_usage"].usage_aggregate,
+        "path",
+        str(tmp_path / "usage_aggregate.json"),
+    )
+    previous_cache = get_llm_cache()
+    set_llm_cache(services.PersistentLLMCache(str(tmp_path / "llm_cache.sqlite3")))
+    yield tmp_path
+    set_llm_cache(previous_cache)
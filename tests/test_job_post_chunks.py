@@ -0,0 +1,53 @@
+import config
+from config import config as config_module
+from models import JobPost, merge_job_descriptions
+
+HEADER = "Acme Corp is hiring a Data Engineer. Our team works from the Austin office."
+BENEFITS = "Compensation: $120,000 - $150,000 per year. This role is fully remote in the US."
+
+
+def test_merge_combines_booleans_and_prefers_mentioned_values():
+    parts = [
+        dict(
+            company="Acme Corp", salary="Competitive", is_fully_remote=False, duties=["Build ETL"]
+        ),
+        dict(salary="$120,000 - $150,000", is_fully_remote=True, duties=["build etl", "Own APIs"]),
+    ]
+
+    merged = merge_job_descriptions(parts, [HEADER, BENEFITS])
+
+    assert merged["is_fully_remote"] is True
+    assert merged["salary"] == "$120,000 - $150,000"
+    assert merged["company"] == "Acme Corp"
+    assert merged["duties"] == ["Build ETL", "Own APIs"]
+
+
+def test_chunked_parse_asks_only_the_header_for_company_and_title(
+    offline_pipeline, monkeypatch
+):
+    chunks = [HEADER, BENEFITS]
+    asked = {}
+
+    def parse_text(self, text, fields):
+        asked[text] = fields
+        if text == HEADER:
+            return dict(
+                company="Acme Corp",
+                job_title="Data Engineer",
+                salary="Competitive",
+                is_fully_remote=False,
+            )
+        return dict(salary="$120,000 - $150,000", is_fully_remote=True)
+
+    for module in (config, config_module):
+        monkeypatch.setattr(module, "JOB_PARSE_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(JobPost, "_parse_text", parse_text)
+    monkeypatch.setattr("utils.chunk_text", lambda text, max_tokens, count: chunks)
+
+    parsed = JobPost(" ".join(chunks)).parse_job_post()
+
+    assert "company" in asked[HEADER] and "job_title" in asked[HEADER]
+    assert "company" not in asked[BENEFITS] and "job_title" not in asked[BENEFITS]
+    assert parsed["is_fully_remote"] is True
+    assert parsed["salary"] == "$120,000 - $150,000"
+    assert parsed["job_title"] == "Data Engineer"
@@ -0,0 +1,46 @@
+import utils
+from services import ResumeImprover
+
+PARAGRAPH = (
+    "We are looking for a Senior Python Engineer to build data pipelines, APIs, and ML "
+    "tooling. You will own services end to end, mentor engineers, and work with product."
+)
+HTML = (
+    "<html><head><title>Senior Python Engineer</title></head><body><div class=job>"
+    "<h1>Senior Python Engineer</h1><p>Location: Austin, TX</p>"
+    + "".join(f"<p>{PARAGRAPH}</p>" for _ in range(4))
+    + "<ul>"
+    + "".join(
+        f"<li>Requirement {i}: experience with Python, SQL, AWS, and Docker at scale.</li>"
+        for i in range(6)
+    )
+    + "</ul></div></body></html>"
+)
+
+
+def _draft(url):
+    resume_improver = ResumeImprover(url, llm_kwargs=dict(cache=False))
+    resume_improver.create_draft_tailored_resume(
+        auto_open=False, manual_review=False, skip_pdf_create=True
+    )
+    return resume_improver
+
+
+def test_duplicate_url_keeps_the_edited_resume(offline_pipeline, monkeypatch):
+    def download(self, url=None, cached=None):
+        self.job_post_html_data = HTML
+        return True
+
+    monkeypatch.setattr(ResumeImprover, "_download_url", download)
+    first = _draft("https://jobs.example.com/posting/1")
+    edited = utils.read_yaml(filename=first.yaml_loc)
+    edited["objective"] = "USER EDITED OBJECTIVE"
+    edited["editing"] = False
+    utils.write_yaml(edited, filename=first.yaml_loc)
+
+    second = _draft("https://another-board.example.org/jobs?id=42")
+
+    assert second.duplicate_of["url"] == "https://jobs.example.com/posting/1"
+    assert second.yaml_loc == first.yaml_loc
+    assert utils.read_yaml(filename=first.yaml_loc) == edited
+    assert second.objective == "USER EDITED OBJECTIVE"
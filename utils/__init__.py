@@ -1,4 +1,7 @@
 from .yaml_handler import *
 from .file_handler import *
 from .pdf_generator import *
-from .resume_format_checker import *
\ No newline at end of file
+from .resume_format_checker import *
+from .html_text_extractor import *
+from .structured_job_data import *
+from .text_chunker import *
@@ -0,0 +1,246 @@
+import re
+from typing import Tuple
+from bs4 import BeautifulSoup, FeatureNotFound, NavigableString
+import config
+
+BOILERPLATE_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "svg",
+    "iframe",
+    "form",
+    "button",
+    "select",
+]
+LANDMARK_TAGS = ["nav", "header", "footer", "aside"]
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "search"}
+BOILERPLATE_TOKENS = {
+    "cookie",
+    "cookies",
+    "consent",
+    "gdpr",
+    "banner",
+    "footer",
+    "nav",
+    "navbar",
+    "navigation",
+    "menu",
+    "breadcrumb",
+    "breadcrumbs",
+    "share",
+    "social",
+    "similar",
+    "related",
+    "recommended",
+    "recommendations",
+    "newsletter",
+    "subscribe",
+    "signup",
+    "login",
+    "modal",
+    "popup",
+    "sidebar",
+    "advert",
+    "ads",
+    "promo",
+}
+PARAGRAPH_TAGS = ["p", "li", "pre", "blockquote", "dd", "td"]
+MIN_PARAGRAPH_CHARS = 25
+# Largest block around the page's <h1> kept as the posting header (title, company, location)
+MAX_HEADING_BLOCK_CHARS = 300
+
+
+def _make_soup(html: str, parser: str = None) -> Tuple[BeautifulSoup, str]:
+    """Parse `html`, falling back to the stdlib parser if the preferred one is missing."""
+    parser = parser or config.HTML_PARSER
+    try:
+        return BeautifulSoup(html, parser), parser
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser"), "html.parser"
+
+
+def _is_boilerplate(element) -> bool:
+    """Return True if the element's role, id or classes mark it as page chrome."""
+    if element.attrs is None:
+        return False
+    if element.get("role") in BOILERPLATE_ROLES or element.get("aria-modal") == "true":
+        return True
+    names = " ".join(element.get("class") or []) + " " + (element.get("id") or "")
+    tokens = set(re.split(r"[\s\-_]+", names.lower()))
+    return bool(tokens & BOILERPLATE_TOKENS)
+
+
+def _strip_boilerplate(soup: BeautifulSoup):
+    """Remove scripts, navigation, banners and similar chrome from the soup in place."""
+    for element in soup.find_all(BOILERPLATE_TAGS):
+        element.decompose()
+    for element in soup.find_all(LANDMARK_TAGS):
+        if element.decomposed or element.find_parent(["main", "article"]):
+            continue
+        element.decompose()
+    page_chars = len(soup.get_text(" ", strip=True))
+    for element in soup.find_all(True):
+        if element.decomposed or element.name in ("html", "body", "main", "article"):
+            continue
+        if not _is_boilerplate(element):
+            continue
+        # A wrapper like <div class="has-sidebar"> may hold the whole posting.
+        if len(element.get_text(" ", strip=True)) > page_chars / 2:
+            continue
+        element.decompose()
+
+
+def _link_density(element) -> float:
+    """Return the share of the element's text that sits inside links."""
+    text_length = len(element.get_text(" ", strip=True))
+    if not text_length:
+        return 1.0
+    link_length = sum(len(a.get_text(" ", strip=True)) for a in element.find_all("a"))
+    return min(1.0, link_length / text_length)
+
+
+def _content_paragraphs(soup: BeautifulSoup) -> list:
+    """Return (node, text length) for every prose paragraph that is not mostly links."""
+    paragraphs = []
+    for paragraph in soup.find_all(PARAGRAPH_TAGS):
+        text = paragraph.get_text(" ", strip=True)
+        if len(text) >= MIN_PARAGRAPH_CHARS and _link_density(paragraph) < 0.5:
+            paragraphs.append((paragraph, text))
+    for div in soup.find_all(["div", "section"]):
+        for child in div.children:
+            if isinstance(child, NavigableString) and len(child.strip()) >= MIN_PARAGRAPH_CHARS:
+                paragraphs.append((child, child.strip()))
+    return paragraphs
+
+
+def _score_blocks(paragraphs: list) -> dict:
+    """Score container blocks by the paragraph text they hold.
+
+    Each paragraph adds its score to its parent and half of it to its grandparent,
+    so the block holding the densest run of prose ends up with the highest score.
+
+    Args:
+        paragraphs (list): The output of `_content_paragraphs`.
+
+    Returns:
+        dict: [element, score] pairs keyed by element id.
+    """
+    scores = {}
+
+    def add(element, score):
+        if element is None or element.name in (None, "[document]"):
+            return
+        entry = scores.setdefault(id(element), [element, 0.0])
+        entry[1] += score
+
+    for paragraph, text in paragraphs:
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.parent
+        add(parent, score)
+        if not isinstance(paragraph, NavigableString) and parent is not None:
+            add(parent.parent, score / 2)
+    for entry in scores.values():
+        entry[1] *= 1 - _link_density(entry[0])
+    return scores
+
+
+def _heading_lines(soup: BeautifulSoup, best) -> list:
+    """Return the `<title>` and the header block around the first `<h1>` outside `best`.
+
+    Career sites often render the job title, company name and location above the
+    description, in a block too short to win the density scoring. The `<h1>` is widened
+    to its enclosing block while that stays under `MAX_HEADING_BLOCK_CHARS`.
+    """
+    lines = []
+    if soup.title is not None:
+        lines.append(soup.title.get_text(" ", strip=True))
+    heading = next(
+        (h1 for h1 in soup.find_all("h1") if h1 is not best and best not in h1.parents),
+        None,
+    )
+    if heading is not None:
+        block = heading
+        while (
+            block.parent is not None
+            and block.parent.name not in ("body", "html", "[document]")
+            and block.parent is not best
+            and block.parent not in best.parents
+            and len(block.parent.get_text(" ", strip=True)) <= MAX_HEADING_BLOCK_CHARS
+        ):
+            block = block.parent
+        lines.extend(block.get_text(separator="\n", strip=True).splitlines())
+    return [line for line in lines if line]
+
+
+def extract_main_text(html: str, parser: str = None) -> Tuple[str, dict]:
+    """Extract the main job posting text from an HTML page.
+
+    Page chrome (scripts, navigation, footers, cookie banners, "similar jobs" lists, ...)
+    is removed first. The remaining blocks are scored by text density and the best
+    one is kept, preceded by the page `<title>` and the header block around its `<h1>`
+    when the best block does not hold the heading itself. Confidence is the share of the page's prose that lies inside that
+    block; when it is too low, the text of the whole page is returned as before.
+
+    Args:
+        html (str): The raw HTML of the page.
+        parser (str, optional): BeautifulSoup parser to use. Defaults to `config.HTML_PARSER`.
+
+    Returns:
+        Tuple[str, dict]: The extracted text and a report describing the extraction.
+    """
+    soup, parser = _make_soup(html, parser)
+    full_text = soup.get_text(separator=" ", strip=True)
+    report = dict(
+        method="full_text",
+        parser=parser,
+        confidence=0.0,
+        original_chars=len(full_text),
+        extracted_chars=len(full_text),
+    )
+    _strip_boilerplate(soup)
+    paragraphs = _content_paragraphs(soup)
+    scores = _score_blocks(paragraphs)
+    total_chars = sum(len(text) for _, text in paragraphs)
+    if scores and total_chars:
+        best, _ = max(scores.values(), key=lambda entry: entry[1])
+
+        def share(element):
+            inside_chars = sum(
+                len(text)
+                for paragraph, text in paragraphs
+                if paragraph.parent is element or element in paragraph.parents
+            )
+            return inside_chars / total_chars
+
+        # Postings often split description and requirements into sibling blocks,
+        # so widen to the nearest ancestor that holds enough of the prose.
+        confidence = share(best)
+        while (
+            confidence < config.JOB_TEXT_MIN_CONFIDENCE
+            and best.parent is not None
+            and best.parent.name not in ("body", "html", "[document]")
+        ):
+            best = best.parent
+            confidence = share(best)
+        main_text = best.get_text(separator="\n", strip=True)
+        if best.find("h1") is None:
+            main_lines = set(main_text.splitlines())
+            heading = [line for line in _heading_lines(soup, best) if line not in main_lines]
+            main_text = "\n".join(list(dict.fromkeys(heading)) + [main_text])
+        report["confidence"] = round(confidence, 3)
+        if (
+            confidence >= config.JOB_TEXT_MIN_CONFIDENCE
+            and len(main_text) >= config.JOB_TEXT_MIN_CHARS
+        ):
+            report["method"] = "main_content"
+            report["extracted_chars"] = len(main_text)
+            full_text = main_text
+    report["removed_chars"] = report["original_chars"] - report["extracted_chars"]
+    report["removed_ratio"] = (
+        round(report["removed_chars"] / report["original_chars"], 3)
+        if report["original_chars"]
+        else 0.0
+    )
+    return full_text, report
@@ -0,0 +1,207 @@
+import re
+import json
+import html as html_lib
+from typing import Optional, Tuple
+from bs4 import BeautifulSoup
+from utils.html_text_extractor import _make_soup
+
+JOB_POSTING_TYPE = "JobPosting"
+BULLET_PREFIX = re.compile(r"^\s*(?:[-*•·▪◦]|\d+[.)])\s*")
+# Items a dedicated list property needs before it replaces the LLM's list
+MIN_LIST_ITEMS = 2
+
+
+def _is_job_posting(item: dict) -> bool:
+    types = item.get("@type") or item.get("type") or []
+    if isinstance(types, str):
+        types = [types]
+    return any(str(t).rsplit("/", 1)[-1] == JOB_POSTING_TYPE for t in types)
+
+
+def _find_job_posting(data) -> Optional[dict]:
+    """Return the first JobPosting object in a JSON-LD document, searching `@graph` and lists."""
+    if isinstance(data, list):
+        for item in data:
+            found = _find_job_posting(item)
+            if found is not None:
+                return found
+    elif isinstance(data, dict):
+        if _is_job_posting(data):
+            return data
+        return _find_job_posting(data.get("@graph"))
+    return None
+
+
+def _json_ld_posting(soup: BeautifulSoup) -> Optional[dict]:
+    for script in soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)}):
+        try:
+            data = json.loads(script.string or script.get_text() or "")
+        except ValueError:
+            continue
+        found = _find_job_posting(data)
+        if found is not None:
+            return found
+    return None
+
+
+def _microdata_value(element):
+    if element.has_attr("itemscope"):
+        return _microdata_item(element)
+    if element.name == "meta":
+        return element.get("content")
+    if element.name in ("a", "link", "area"):
+        return element.get("href")
+    if element.name in ("img", "audio", "video", "source", "embed", "iframe"):
+        return element.get("src")
+    if element.name in ("time", "data", "meter") and (
+        element.get("datetime") or element.get("value")
+    ):
+        return element.get("datetime") or element.get("value")
+    return element.decode_contents()
+
+
+def _microdata_item(scope) -> dict:
+    """Collect the itemprop values that belong to one itemscope, nesting inner items."""
+    item = {"@type": scope.get("itemtype", "")}
+    for element in scope.find_all(attrs={"itemprop": True}):
+        owner = element.find_parent(attrs={"itemscope": True})
+        if owner is not scope:
+            continue
+        value = _microdata_value(element)
+        for name in element["itemprop"].split():
+            if name in item:
+                if not isinstance(item[name], list):
+                    item[name] = [item[name]]
+                item[name].append(value)
+            else:
+                item[name] = value
+    return item
+
+
+def _microdata_posting(soup: BeautifulSoup) -> Optional[dict]:
+    for scope in soup.find_all(attrs={"itemscope": True, "itemtype": True}):
+        if _is_job_posting({"@type": scope["itemtype"].split()}):
+            return _microdata_item(scope)
+    return None
+
+
+def html_to_text(value) -> str:
+    """Return the text of an HTML fragment, which JSON-LD often stores entity-escaped."""
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("description") or value.get("credentialCategory") or ""
+    text = html_lib.unescape(str(value))
+    if "<" in text:
+        text = BeautifulSoup(text, "html.parser").get_text(separator="\n", strip=True)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _text_list(value) -> list:
+    """Split a text or list property into clean list items, one per line or bullet."""
+    values = value if isinstance(value, list) else [value]
+    items = []
+    for value in values:
+        for line in html_to_text(value).splitlines():
+            line = BULLET_PREFIX.sub("", line).strip()
+            if len(line) > 2 and line not in items:
+                items.append(line)
+    return items
+
+
+def _number(value) -> Optional[str]:
+    try:
+        number = float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    return f"{number:,.0f}" if number.is_integer() else f"{number:,.2f}"
+
+
+def _format_salary(value) -> Optional[str]:
+    """Format a schema.org MonetaryAmount, e.g. "USD 120,000-150,000 per year"."""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, dict):
+        return html_to_text(value) or None
+    amount = value.get("value")
+    unit = None
+    if isinstance(amount, dict):
+        unit = amount.get("unitText")
+        low, high = _number(amount.get("minValue")), _number(amount.get("maxValue"))
+        exact = _number(amount.get("value"))
+        if low and high and low != high:
+            figure = f"{low}-{high}"
+        else:
+            figure = exact or low or high
+    else:
+        figure = _number(amount)
+    if not figure:
+        return None
+    salary = " ".join(part for part in (value.get("currency"), figure) if part)
+    return f"{salary} per {str(unit).lower()}" if unit else salary
+
+
+def _job_fields(posting: dict) -> Tuple[dict, dict]:
+    """Map a schema.org JobPosting onto the `JobDescription` fields it determines.
+
+    Duties and qualifications count as known only when the dedicated `responsibilities`
+    and `qualifications` properties list at least `MIN_LIST_ITEMS` items. Shorter lists,
+    and `experienceRequirements` and `educationRequirements` on their own, often hold a
+    single summary line, so they are returned as extra items for the LLM's lists instead.
+
+    Returns:
+        Tuple[dict, dict]: The known fields, and the extra list items per field.
+    """
+    organization = posting.get("hiringOrganization")
+    if isinstance(organization, list):
+        organization = organization[0] if organization else None
+    location_types = posting.get("jobLocationType") or []
+    if isinstance(location_types, str):
+        location_types = [location_types]
+    duties = _text_list(posting.get("responsibilities"))
+    qualifications = _text_list(posting.get("qualifications"))
+    for key in ("experienceRequirements", "educationRequirements"):
+        qualifications.extend(
+            item for item in _text_list(posting.get(key)) if item not in qualifications
+        )
+    fields = dict(
+        company=html_to_text(organization),
+        job_title=html_to_text(posting.get("title")),
+        salary=_format_salary(posting.get("baseSalary") or posting.get("estimatedSalary")),
+        is_fully_remote=(
+            True if any("TELECOMMUTE" in str(t).upper() for t in location_types) else None
+        ),
+    )
+    extras = {}
+    for name, items, source in (
+        ("duties", duties, "responsibilities"),
+        ("qualifications", qualifications, "qualifications"),
+    ):
+        if len(_text_list(posting.get(source))) >= MIN_LIST_ITEMS:
+            fields[name] = items
+        elif items:
+            extras[name] = items
+    return {key: value for key, value in fields.items() if value not in (None, "", [])}, extras
+
+
+def extract_job_posting(html: str, parser: str = None) -> Tuple[dict, dict, str, Optional[str]]:
+    """Extract a schema.org JobPosting embedded in a page as JSON-LD or microdata.
+
+    Args:
+        html (str): The raw HTML of the page.
+        parser (str, optional): BeautifulSoup parser to use. Defaults to `config.HTML_PARSER`.
+
+    Returns:
+        Tuple[dict, dict, str, Optional[str]]: The `JobDescription` fields found, the list
+            items to merge into the LLM's duties and qualifications (see `_job_fields`), the
+            plain text of the posting's description, and the source ("json-ld" or
+            "microdata"), or `({}, {}, "", None)` when the page has no JobPosting.
+    """
+    soup, _ = _make_soup(html, parser)
+    posting, source = _json_ld_posting(soup), "json-ld"
+    if posting is None:
+        posting, source = _microdata_posting(soup), "microdata"
+    if posting is None:
+        return {}, {}, "", None
+    fields, extras = _job_fields(posting)
+    return fields, extras, html_to_text(posting.get("description")), source
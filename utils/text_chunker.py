@@ -0,0 +1,99 @@
+import re
+from typing import Callable, List
+
+SECTION_KEYWORDS = re.compile(
+    r"\b(about|overview|summary|description|role|position|responsibilities|duties|"
+    r"what you(?:'ll| will)|who you are|requirements|qualifications|skills|experience|"
+    r"education|nice to have|preferred|bonus|benefits|perks|compensation|salary|pay|"
+    r"location|schedule|how to apply|equal opportunity|eeo|disclaimer|legal)\b",
+    re.IGNORECASE,
+)
+MAX_HEADING_WORDS = 8
+
+
+def _approximate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def is_section_heading(line: str) -> bool:
+    """Guess whether a line of extracted job text is a section heading.
+
+    Headings are short lines that end with a colon, are written in capitals, or name a
+    usual posting section ("Responsibilities", "What you'll do", "Benefits", ...)
+    without ending like a sentence.
+    """
+    line = line.strip()
+    words = line.split()
+    if not words or len(words) > MAX_HEADING_WORDS:
+        return False
+    if line.endswith(":"):
+        return True
+    if line.isupper() and any(c.isalpha() for c in line):
+        return True
+    return not line.endswith((".", ",", ";")) and bool(SECTION_KEYWORDS.search(line))
+
+
+def split_sections(text: str) -> List[str]:
+    """Split text into sections that each start at a heading line."""
+    sections, current = [], []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if current and is_section_heading(line):
+            sections.append("\n".join(current))
+            current = []
+        current.append(line.strip())
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def _split_oversized(text: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[str]:
+    """Split a section longer than `max_tokens` by lines, and a line that is too long by words."""
+    pieces = []
+    for line in text.splitlines():
+        if count_tokens(line) <= max_tokens:
+            pieces.append(line)
+            continue
+        words = line.split()
+        # Approximate the words per window from the line's own token density.
+        window = max(1, len(words) * max_tokens // count_tokens(line))
+        pieces.extend(" ".join(words[i : i + window]) for i in range(0, len(words), window))
+    return pieces
+
+
+def chunk_text(
+    text: str, max_tokens: int, count_tokens: Callable[[str], int] = None
+) -> List[str]:
+    """Split text into chunks of at most `max_tokens` tokens along section boundaries.
+
+    Consecutive sections are packed into the same chunk while they fit. Only a section
+    that is longer than a chunk on its own is split further, by lines and then by words.
+
+    Args:
+        text (str): The text to split.
+        max_tokens (int): Token budget of a chunk.
+        count_tokens (Callable[[str], int], optional): Token counter. Defaults to four
+            characters per token.
+
+    Returns:
+        List[str]: The chunks, in text order.
+    """
+    count_tokens = count_tokens or _approximate_tokens
+    pieces = []
+    for section in split_sections(text):
+        if count_tokens(section) <= max_tokens:
+            pieces.append(section)
+        else:
+            pieces.extend(_split_oversized(section, max_tokens, count_tokens))
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks